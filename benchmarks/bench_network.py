@@ -0,0 +1,150 @@
+""" Throughput of the download paths of PubMedQuery against a local mock of
+    the E-utilities (benchmarks.mock_eutils), no requests reach NCBI.
+
+    python -m benchmarks.bench_network [recorded.xml[.gz] ...] [--articles N]
+                                       [--latency 0.05] [--error-rate 0.01]
+                                       [--workers 4] [--batch-size 250]
+
+Reports articles/s, MB/s served and the p50/p99 latency of the efetch and
+esummary batches for query, query (history server), query (esummary),
+query_ids and the parse stage. The mock server runs in a separate process,
+so it doesn't compete with the client for the interpreter.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import subprocess
+import sys
+import time
+
+import requests
+
+from benchmarks import fixtures
+from utils.pmq import PubMedQuery, iterArticles
+
+
+def _percentile(values, percent):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+def _served(url):
+    stats = requests.get(f"{url}/mock/stats").json()
+    return sum(endpoint["bytes"] for endpoint in stats.values()), stats
+
+
+def _timed(pmq):
+    """ Record the duration of every batch download of a PubMedQuery.
+    """
+
+    durations = []
+    fetch_batch = pmq._fetchBatch
+
+    def timed_batch(*args, **kwargs):
+        started = time.perf_counter()
+        complete = yield from fetch_batch(*args, **kwargs)
+        durations.append(time.perf_counter() - started)
+        return complete
+
+    pmq._fetchBatch = timed_batch
+    return durations
+
+
+def _run(url, name, function, args):
+    with PubMedQuery(
+        email="benchmark@example.org", base_url=url, rate_limit=args.rate_limit
+    ) as pmq:
+        durations = _timed(pmq)
+        served, _ = _served(url)
+        started = time.perf_counter()
+        count = sum(1 for _ in function(pmq))
+        elapsed = time.perf_counter() - started
+        served = _served(url)[0] - served
+
+    return (
+        name,
+        count,
+        count / elapsed,
+        served / elapsed / 1e6,
+        _percentile(durations, 50) * 1000,
+        _percentile(durations, 99) * 1000,
+    )
+
+
+def _parse(documents):
+    def chunked(document, size=64 * 1024):
+        for index in range(0, len(document), size):
+            yield document[index : index + size]
+
+    started = time.perf_counter()
+    count = sum(1 for document in documents for _ in iterArticles(chunked(document)))
+    elapsed = time.perf_counter() - started
+    size = sum(map(len, documents))
+    return "parse stage", count, count / elapsed, size / elapsed / 1e6, float("nan"), float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("files", nargs="*", help="recorded efetch XML documents")
+    parser.add_argument("--articles", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--abstract-words", type=int, default=200)
+    parser.add_argument("--compress", action="store_true")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--rate-limit", type=float, default=1000)
+    args = parser.parse_args()
+
+    command = [
+        sys.executable, "-m", "benchmarks.mock_eutils", *args.files,
+        "--port", "0",
+        "--count", str(args.articles),
+        "--latency", str(args.latency),
+        "--jitter", str(args.jitter),
+        "--error-rate", str(args.error_rate),
+        "--abstract-words", str(args.abstract_words),
+    ]
+    if args.compress:
+        command.append("--compress")
+    server = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+
+    try:
+        url = server.stdout.readline().split()[-1]
+        options = {"workers": args.workers, "batch_size": args.batch_size}
+
+        # The IDs of the whole mock database, for query_ids
+        with PubMedQuery(email="benchmark@example.org", base_url=url, rate_limit=args.rate_limit) as pmq:
+            ids = pmq._getArticleIds("benchmark", max_results=-1)
+
+        # Missing publication dates are reported on stdout, keep the table readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = [
+                _run(url, "query", lambda pmq: pmq.query("benchmark", max_results=-1, **options), args),
+                _run(url, "query, history server", lambda pmq: pmq.query("benchmark", max_results=-1, use_history=True, **options), args),
+                _run(url, "query, esummary", lambda pmq: pmq.query("benchmark", max_results=-1, summary=True, **options), args),
+                _run(url, "query_ids", lambda pmq: pmq.query_ids(",".join(ids), **options), args),
+                _parse([fixtures.efetch_xml(ids[:2000], abstract_words=args.abstract_words)]),
+            ]
+        _, stats = _served(url)
+
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"{len(ids)} articles, latency {args.latency * 1000:.0f} ms, error rate {args.error_rate:.1%}, {args.workers} worker(s)")
+    print(f"{'':<24}{'articles':>10}{'articles/s':>12}{'MB/s':>8}{'p50 ms':>9}{'p99 ms':>9}")
+    for name, count, rate, throughput, p50, p99 in results:
+        print(f"{name:<24}{count:>10}{rate:>12.0f}{throughput:>8.1f}{p50:>9.1f}{p99:>9.1f}")
+    print("requests (errors) per endpoint: " + json.dumps(
+        {endpoint: f"{counts['requests']} ({counts['errors']})" for endpoint, counts in stats.items()}
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+""" Articles/second of the efetch XML parsing stage.
+
+    python -m benchmarks.bench_parse [recorded.xml[.gz] ...] [--articles N]
+
+Without files, a synthetic efetch document is generated.
+"""
+
+import argparse
+import contextlib
+import io
+import time
+import xml.etree.ElementTree as xml
+
+from benchmarks import fixtures
+from utils.pmq import PubMedArticle, PubMedBookArticle, getContent, iterArticles
+
+
+def articleFromPaths(element):
+    """ Reference extraction of a PubmedArticle with one path lookup per field,
+        the single pass in PubMedArticle._initializeFromXML must match it.
+    """
+
+    article = PubMedArticle.__new__(PubMedArticle)
+    article.pubmed_id = getContent(element, ".//ArticleId[@IdType='pubmed']")
+    article.title = getContent(element, ".//ArticleTitle")
+    article.keywords = [
+        keyword.text for keyword in element.findall(".//Keyword") if keyword is not None
+    ]
+    article.journal = getContent(element, ".//Journal/Title")
+    article.abstract = getContent(element, ".//AbstractText")
+    article.conclusions = getContent(element, ".//AbstractText[@Label='CONCLUSION']")
+    article.methods = getContent(element, ".//AbstractText[@Label='METHOD']")
+    article.results = getContent(element, ".//AbstractText[@Label='RESULTS']")
+    article.copyrights = getContent(element, ".//CopyrightInformation")
+    article.doi = getContent(element, ".//ArticleId[@IdType='doi']")
+    article.publication_date = article._parsePublicationDate(
+        element.find(".//PubMedPubDate[@PubStatus='pubmed']")
+    )
+    article.authors = [
+        {
+            "lastname": getContent(author, ".//LastName", None),
+            "firstname": getContent(author, ".//ForeName", None),
+            "initials": getContent(author, ".//Initials", None),
+            "affiliation": getContent(author, ".//AffiliationInfo/Affiliation", None),
+        }
+        for author in element.findall(".//Author")
+    ]
+    article.xml = element
+    return article
+
+
+def bookFromPaths(element):
+    """ Reference extraction of a PubmedBookArticle with one path lookup per
+        field, the single pass in PubMedBookArticle._initializeFromXML must
+        match it.
+    """
+
+    article = PubMedBookArticle.__new__(PubMedBookArticle)
+    article.pubmed_id = getContent(element, ".//ArticleId[@IdType='pubmed']")
+    article.title = getContent(element, ".//BookTitle")
+    article.abstract = getContent(element, ".//AbstractText")
+    article.copyrights = getContent(element, ".//CopyrightInformation")
+    article.doi = getContent(element, ".//ArticleId[@IdType='doi']")
+    article.isbn = getContent(element, ".//Isbn")
+    article.language = getContent(element, ".//Language")
+    article.publication_date = getContent(element, ".//PubDate/Year")
+    article.authors = [
+        {
+            "collective": getContent(author, ".//CollectiveName"),
+            "lastname": getContent(author, ".//LastName"),
+            "firstname": getContent(author, ".//ForeName"),
+            "initials": getContent(author, ".//Initials"),
+        }
+        for author in element.findall(".//Author")
+    ]
+    article.publication_type = getContent(element, ".//PublicationType")
+    article.publisher = getContent(element, ".//Publisher/PublisherName")
+    article.publisher_location = getContent(element, ".//Publisher/PublisherLocation")
+    article.sections = [
+        {
+            "title": getContent(section, ".//SectionTitle"),
+            "chapter": getContent(section, ".//LocationLabel"),
+        }
+        for section in element.findall(".//Section")
+    ]
+    return article
+
+
+def _fromPaths(elements):
+    for element, cls in elements:
+        if cls is PubMedArticle:
+            articleFromPaths(element)
+        else:
+            bookFromPaths(element)
+
+
+def _build(elements, method):
+    for element, cls in elements:
+        article = cls.__new__(cls)
+        getattr(article, method)(element)
+
+
+def _rate(function, count, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return count / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("files", nargs="*", help="recorded efetch XML documents")
+    parser.add_argument("--articles", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.files:
+        documents = list(fixtures.load(args.files))
+    else:
+        documents = [fixtures.efetch_xml(range(30000000, 30000000 + args.articles))]
+
+    elements = []
+    for document in documents:
+        root = xml.fromstring(document)
+        elements += [(element, PubMedArticle) for element in root.iter("PubmedArticle")]
+        elements += [(element, PubMedBookArticle) for element in root.iter("PubmedBookArticle")]
+    count = len(elements)
+
+    def chunked(document, size=64 * 1024):
+        for index in range(0, len(document), size):
+            yield document[index : index + size]
+
+    def whole_document():
+        for document in documents:
+            root = xml.fromstring(document)
+            _build([(e, PubMedArticle) for e in root.iter("PubmedArticle")], "_initializeFromXML")
+            _build([(e, PubMedBookArticle) for e in root.iter("PubmedBookArticle")], "_initializeFromXML")
+
+    def streaming():
+        for document in documents:
+            for _ in iterArticles(chunked(document)):
+                pass
+
+    # Missing publication dates are reported on stdout, keep the table readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = [
+            ("extract, per-field paths", _rate(lambda: _fromPaths(elements), count, args.repeat)),
+            ("extract, single pass", _rate(lambda: _build(elements, "_initializeFromXML"), count, args.repeat)),
+            ("parse + extract, whole document", _rate(whole_document, count, args.repeat)),
+            ("parse + extract, streaming", _rate(streaming, count, args.repeat)),
+        ]
+
+    print(f"{count} articles, {sum(map(len, documents)) / 1e6:.1f} MB XML")
+    for name, rate in results:
+        print(f"{name:<34}{rate:>10.0f} articles/s")
+
+
+if __name__ == "__main__":
+    main()
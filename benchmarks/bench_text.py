@@ -0,0 +1,86 @@
+""" Tokens/second of the text normalization of the App (cleaning, isolated
+    numbers, stopwords and tokenization, without lemmatization).
+
+    python -m benchmarks.bench_text [recorded.xml[.gz] ...] [--articles N]
+
+Compares the previous chain (_clean_text, _remove_stopwords and word_tokenize)
+with utils.text.TextNormalizer on the titles and abstracts of a synthetic
+efetch document, or of the given recorded documents, and checks that both
+return the same tokens.
+"""
+
+import argparse
+import json
+import re
+import time
+
+from nltk.tokenize import word_tokenize
+
+from benchmarks import fixtures
+from utils.pmq import iterArticles
+from utils.text import TextNormalizer
+
+
+def _clean_text(text, remove_isolated_numbers=True):
+    words = []
+    for element in text.split():
+        if remove_isolated_numbers:
+            element = re.sub(r"\b(\d+|[a-z])\b *", "", element)
+        element = re.sub("[^a-zA-Z0-9 .,]|(?<!\\d)[.,]|[.,](?!\\d)", "", element)
+        element = element.replace(" ", "")
+        if element != "":
+            words.append(element.lower())
+    return " ".join(words)
+
+
+def _remove_stopwords(text, stopwords):
+    return " ".join(word for word in text.split() if word.lower() not in stopwords)
+
+
+def chain(text, stopwords):
+    return word_tokenize(_remove_stopwords(_clean_text(text), stopwords))
+
+
+def _rate(function, texts, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = sum(len(function(text)) for text in texts)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return count, count / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("files", nargs="*", help="recorded efetch XML documents")
+    parser.add_argument("--articles", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.files:
+        documents = list(fixtures.load(args.files))
+    else:
+        documents = [fixtures.efetch_xml(range(30000000, 30000000 + args.articles))]
+
+    texts = []
+    for document in documents:
+        for article in iterArticles([document], fields=("title", "abstract")):
+            texts += [text for text in (article.title, article.abstract) if text]
+
+    with open("utils/stopWords.json", encoding="utf8") as json_file:
+        stopwords = json.load(json_file)["words"]
+    normalizer = TextNormalizer(stopwords)
+
+    mismatches = sum(1 for text in texts if chain(text, stopwords) != normalizer.tokens(text))
+
+    count, chain_rate = _rate(lambda text: chain(text, stopwords), texts, args.repeat)
+    _, normalizer_rate = _rate(normalizer.tokens, texts, args.repeat)
+
+    print(f"{len(texts)} texts, {count} tokens, {mismatches} texts with different tokens")
+    print(f"{'clean, stopwords, word_tokenize':<34}{chain_rate:>10.0f} tokens/s")
+    print(f"{'TextNormalizer':<34}{normalizer_rate:>10.0f} tokens/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+import gzip
+import random
+from typing import Iterable, Iterator
+from xml.sax.saxutils import escape
+
+
+# Vocabulary of the generated titles, abstracts and keywords
+WORDS = (
+    "cancer patients bone tumor cell cells study studies treatment therapy results "
+    "clinical trial gene expression protein analysis risk factors women men children "
+    "mortality survival increased decreased significant model data associated with "
+    "in of the and for was were we our 95% CI 0.05 p<0.001 1,000 3.5 (n=45) [12] "
+    "COVID-19 mRNA SARS-CoV-2 IL-6 a"
+).split()
+
+JOURNALS = (
+    "Journal of clinical medicine",
+    "Nature",
+    "Cell reports",
+    "PloS one",
+    "BMC cancer",
+)
+
+DOCTYPE = (
+    '<?xml version="1.0" ?>\n'
+    '<!DOCTYPE PubmedArticleSet PUBLIC "-//NLM//DTD PubMedArticle, 1st January 2019//EN"'
+    ' "https://dtd.nlm.nih.gov/ncbi/pubmed/out/pubmed_190101.dtd">\n'
+)
+
+
+def _sentence(rng, length):
+    return " ".join(rng.choice(WORDS) for _ in range(length)).capitalize() + "."
+
+
+def article_xml(
+    pmid: int, rng: random.Random, abstract_words: int = 200, references: int = 20
+) -> str:
+    """ Generate a PubmedArticle element shaped like an efetch record.
+    """
+
+    year = rng.randint(1990, 2024)
+    parts = [
+        '<PubmedArticle><MedlineCitation Status="MEDLINE" Owner="NLM">',
+        '<PMID Version="1">%d</PMID><Article PubModel="Print"><Journal>' % pmid,
+        '<ISSN IssnType="Electronic">1234-5678</ISSN><JournalIssue CitedMedium="Internet">',
+        "<Volume>8</Volume><PubDate><Year>%d</Year><Month>Jul</Month></PubDate>" % year,
+        "</JournalIssue><Title>%s</Title>" % escape(rng.choice(JOURNALS)),
+        "<ISOAbbreviation>J</ISOAbbreviation></Journal>",
+        "<ArticleTitle>%s</ArticleTitle>" % escape(_sentence(rng, 12)),
+        '<ELocationID EIdType="doi" ValidYN="Y">10.1000/%d</ELocationID><Abstract>' % pmid,
+    ]
+    for label in ("BACKGROUND", "METHOD", "RESULTS", "CONCLUSION"):
+        parts.append(
+            '<AbstractText Label="%s" NlmCategory="%s">%s</AbstractText>'
+            % (label, label, escape(_sentence(rng, max(1, abstract_words // 4))))
+        )
+    parts.append(
+        "<CopyrightInformation>Copyright %d</CopyrightInformation></Abstract>" % year
+    )
+    parts.append('<AuthorList CompleteYN="Y">')
+    for index in range(rng.randint(1, 12)):
+        parts.append(
+            '<Author ValidYN="Y"><LastName>Name%d</LastName><ForeName>First %d</ForeName>'
+            "<Initials>F</Initials><AffiliationInfo><Affiliation>Department %d, University"
+            "</Affiliation></AffiliationInfo></Author>" % (index, index, index)
+        )
+    if rng.random() < 0.2:
+        parts.append('<Author ValidYN="Y"><CollectiveName>Study Group</CollectiveName></Author>')
+    parts.append("</AuthorList><Language>eng</Language><PublicationTypeList>")
+    parts.append('<PublicationType UI="D016428">Journal Article</PublicationType>')
+    parts.append('</PublicationTypeList></Article><KeywordList Owner="NOTNLM">')
+    for _ in range(rng.randint(0, 6)):
+        parts.append(
+            '<Keyword MajorTopicYN="N">%s</Keyword>' % escape(_sentence(rng, 2)[:-1])
+        )
+    parts.append("</KeywordList></MedlineCitation><PubmedData><History>")
+    parts.append(
+        '<PubMedPubDate PubStatus="received"><Year>%d</Year><Month>1</Month>'
+        "<Day>2</Day></PubMedPubDate>" % year
+    )
+    parts.append(
+        '<PubMedPubDate PubStatus="pubmed"><Year>%d</Year><Month>%d</Month>'
+        "<Day>%d</Day><Hour>6</Hour><Minute>0</Minute></PubMedPubDate>"
+        % (year, rng.randint(1, 12), rng.randint(1, 28))
+    )
+    parts.append("</History><PublicationStatus>epublish</PublicationStatus>")
+    parts.append(
+        '<ArticleIdList><ArticleId IdType="pubmed">%d</ArticleId>'
+        '<ArticleId IdType="doi">10.1000/%d</ArticleId></ArticleIdList>' % (pmid, pmid)
+    )
+    parts.append("<ReferenceList>")
+    for _ in range(references):
+        parts.append(
+            "<Reference><Citation>Reference citation.</Citation><ArticleIdList>"
+            '<ArticleId IdType="pubmed">%d</ArticleId></ArticleIdList></Reference>'
+            % rng.randint(1, 30000000)
+        )
+    parts.append("</ReferenceList></PubmedData></PubmedArticle>")
+    return "".join(parts)
+
+
+def book_xml(pmid: int, rng: random.Random) -> str:
+    """ Generate a PubmedBookArticle element shaped like an efetch record.
+    """
+
+    return (
+        '<PubmedBookArticle><BookDocument><PMID Version="1">%d</PMID>'
+        '<ArticleIdList><ArticleId IdType="bookaccession">NBK%d</ArticleId></ArticleIdList>'
+        "<Book><Publisher><PublisherName>University of Washington</PublisherName>"
+        "<PublisherLocation>Seattle (WA)</PublisherLocation></Publisher>"
+        '<BookTitle book="gene">GeneReviews</BookTitle><PubDate><Year>1993</Year></PubDate>'
+        '<AuthorList Type="editors"><Author><LastName>Editor</LastName><ForeName>A</ForeName>'
+        "<Initials>A</Initials></Author></AuthorList><Isbn>0000000000</Isbn></Book>"
+        '<Language>eng</Language><AuthorList Type="authors"><Author><LastName>Author</LastName>'
+        "<ForeName>B</ForeName><Initials>B</Initials></Author></AuthorList>"
+        '<PublicationType UI="D016454">Review</PublicationType><Abstract>'
+        "<AbstractText>%s</AbstractText><CopyrightInformation>Copyright</CopyrightInformation>"
+        "</Abstract><Sections><Section><SectionTitle>Summary</SectionTitle>"
+        '<LocationLabel Type="chapter">1</LocationLabel></Section></Sections></BookDocument>'
+        '<PubmedBookData><History><PubMedPubDate PubStatus="pubmed"><Year>2000</Year>'
+        "</PubMedPubDate></History><ArticleIdList>"
+        '<ArticleId IdType="pubmed">%d</ArticleId></ArticleIdList></PubmedBookData>'
+        "</PubmedBookArticle>" % (pmid, pmid, escape(_sentence(rng, 50)), pmid)
+    )
+
+
+def record_xml(
+    pmid: int, seed: int = 0, abstract_words: int = 200, references: int = 20
+) -> str:
+    """ Generate the deterministic record of a PMID, every 50th record is a book
+        article.
+    """
+
+    pmid = int(pmid)
+    rng = random.Random(pmid * 7919 + seed)
+    if pmid % 50 == 7:
+        return book_xml(pmid, rng)
+    return article_xml(pmid, rng, abstract_words=abstract_words, references=references)
+
+
+def efetch_xml(
+    pmids: Iterable, seed: int = 0, abstract_words: int = 200, references: int = 20
+) -> bytes:
+    """ Generate a deterministic efetch XML document for the given PMIDs.
+    """
+
+    parts = [DOCTYPE, "<PubmedArticleSet>"]
+    for pmid in pmids:
+        parts.append(record_xml(pmid, seed, abstract_words, references))
+    parts.append("</PubmedArticleSet>")
+    return "".join(parts).encode("utf-8")
+
+
+def summary_record(pmid: int, seed: int = 0) -> dict:
+    """ Generate the deterministic esummary record of a PMID (JSON mode).
+    """
+
+    pmid = int(pmid)
+    rng = random.Random(pmid * 7919 + seed)
+    year = rng.randint(1990, 2024)
+    if pmid % 50 == 7:
+        return {
+            "uid": str(pmid),
+            "booktitle": "GeneReviews",
+            "pubdate": "1993",
+            "publishername": "University of Washington",
+            "publisherlocation": "Seattle (WA)",
+            "authors": [{"name": "Author B", "authtype": "Author"}],
+            "lang": ["eng"],
+            "pubtype": ["Review"],
+            "articleids": [{"idtype": "pubmed", "value": str(pmid)}],
+        }
+    return {
+        "uid": str(pmid),
+        "title": _sentence(rng, 12),
+        "fulljournalname": rng.choice(JOURNALS),
+        "pubdate": f"{year} Jul",
+        "sortpubdate": f"{year}/07/01 00:00",
+        "authors": [
+            {"name": f"Name{index} F", "authtype": "Author"}
+            for index in range(rng.randint(1, 12))
+        ],
+        "lang": ["eng"],
+        "pubtype": ["Journal Article"],
+        "history": [{"pubstatus": "pubmed", "date": f"{year}/07/16 06:00"}],
+        "articleids": [
+            {"idtype": "pubmed", "value": str(pmid)},
+            {"idtype": "doi", "value": f"10.1000/{pmid}"},
+        ],
+    }
+
+
+def load(paths: Iterable[str]) -> Iterator[bytes]:
+    """ Read recorded efetch XML documents (plain or gzip compressed).
+    """
+
+    for path in paths:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rb") as document:
+            yield document.read()
@@ -0,0 +1,411 @@
+""" Local stand-in for the E-utilities (esearch, efetch, esummary, epost).
+
+    python -m benchmarks.mock_eutils [--port 8000] [--count 100000] [--latency 0.05]
+                                     [--error-rate 0.01] [recorded.xml[.gz] ...]
+
+Serves generated records (benchmarks.fixtures) or the records of recorded
+efetch documents, with configurable latency, payload size, injected 429/5xx
+errors and efetch responses that stall mid-body. Point PubMedQuery at it with base_url (and a higher rate_limit):
+
+    PubMedQuery(email=..., base_url="http://127.0.0.1:8000", rate_limit=1000)
+
+GET /mock/stats returns the requests, errors and bytes served per endpoint.
+"""
+
+import argparse
+import bisect
+import datetime
+import gzip
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterable, Optional
+from urllib.parse import parse_qs, urlsplit
+import xml.etree.ElementTree as xml
+
+from benchmarks import fixtures
+from utils.pmq import elementPmid, iterArticleElements
+
+
+# Publication dates of the generated records are spread over this range
+FIRST_DATE = datetime.date(1990, 1, 1)
+LAST_DATE = datetime.date(2024, 12, 31)
+
+# esearch doesn't return results past this position
+ESEARCH_WINDOW = 10000
+
+# Modification date range of a search term, ("2024/01/31"[mdat] : "3000"[mdat])
+MDAT_RANGE = re.compile(r'"([\d/]+)"\[mdat\]\s*:\s*"([\d/]+)"\[mdat\]')
+
+
+class MockEutils(object):
+    """ E-utilities server on a background thread. PMIDs grow with the
+        publication date, esearch returns the newest first and honors the
+        mindate/maxdate windows and a modification date range in the term,
+        the rest of the search term is ignored.
+    """
+
+    def __init__(
+        self: object,
+        count: int = 10000,
+        first_pmid: int = 30000000,
+        recorded: Optional[Iterable[bytes]] = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: tuple = (429, 500, 502, 503),
+        stalls: int = 0,
+        stall_seconds: float = 5.0,
+        abstract_words: int = 200,
+        references: int = 20,
+        compress: bool = False,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        """ Initialization of the server (started by start or the with statement).
+            Parameters:
+                - count         Int, number of generated records.
+                - first_pmid    Int, PMID of the oldest generated record.
+                - recorded      Iterable, efetch documents whose records are
+                                served instead of generated ones.
+                - latency       Float, seconds every response is delayed.
+                - jitter        Float, random extra delay up to this many seconds.
+                - error_rate    Float, share of the requests answered with one of
+                                error_status (with Retry-After: 0).
+                - stalls        Int, number of efetch responses that stop after
+                                half of their body for stall_seconds and then
+                                close the connection.
+                - abstract_words Int, size of the generated abstracts.
+                - references    Int, references per generated record.
+                - compress      Bool, gzip the responses if the client accepts it.
+        """
+
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.stalls = stalls
+        self.stall_seconds = stall_seconds
+        self.abstract_words = abstract_words
+        self.references = references
+        self.compress = compress
+        self.seed = seed
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._records = {}
+        self._history = {}
+        self._modified = {}
+        self.stats = {}
+
+        # PMIDs in the order of their publication dates (day ordinals)
+        if recorded is not None:
+            for document in recorded:
+                for element in iterArticleElements([document]):
+                    self._records[int(elementPmid(element))] = xml.tostring(
+                        element, encoding="unicode"
+                    )
+            self.pmids = sorted(self._records)
+        else:
+            self.pmids = list(range(first_pmid, first_pmid + count))
+        self._known = set(self.pmids)
+        days = (LAST_DATE - FIRST_DATE).days
+        self.dates = [
+            FIRST_DATE.toordinal() + index * days // max(1, len(self.pmids) - 1)
+            for index in range(len(self.pmids))
+        ]
+
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self: object) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self: object) -> object:
+        self.start()
+        return self
+
+    def __exit__(self: object, *exc_info) -> None:
+        self.stop()
+
+    def start(self: object) -> None:
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def serve_forever(self: object) -> None:
+        """ Serve on the calling thread until interrupted.
+        """
+
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+    def stop(self: object) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def record(self: object, pmid: int) -> str:
+        """ The efetch XML of a record, generated records are kept once built.
+        """
+
+        text = self._records.get(pmid)
+        if text is None:
+            text = fixtures.record_xml(
+                pmid, self.seed, self.abstract_words, self.references
+            )
+            self._records[pmid] = text
+        return text
+
+    def modify(self: object, pmids: Iterable[int], day: Optional[datetime.date] = None) -> None:
+        """ Mark records as revised, an [mdat] range in the search term finds
+            them by this day (records that are never modified keep their
+            publication date).
+        """
+
+        day = (day or datetime.date.today()).toordinal()
+        with self._lock:
+            for pmid in pmids:
+                self._modified[pmid] = day
+
+    def warm(self: object) -> None:
+        """ Build all generated records up front, so the server doesn't compete
+            with the client for the CPU during a measurement.
+        """
+
+        for pmid in self.pmids:
+            self.record(pmid)
+
+    # ---------------------------------------------------------
+    # endpoints
+    # ---------------------------------------------------------
+
+    def esearch(self: object, parameters: dict) -> tuple:
+        pmids = self._window(parameters)
+        result = {"count": str(len(pmids))}
+
+        if parameters.get("usehistory") == "y":
+            result["webenv"], result["querykey"] = self._store(None, pmids[::-1])
+
+        # Newest first, nothing past the esearch window
+        retstart = int(parameters.get("retstart", 0))
+        retmax = int(parameters.get("retmax", 20))
+        end = min(retstart + retmax, ESEARCH_WINDOW, len(pmids))
+        ids = [str(pmids[-1 - index]) for index in range(retstart, max(retstart, end))]
+        result["retmax"] = str(len(ids))
+        result["retstart"] = str(retstart)
+        result["idlist"] = ids
+        return "application/json", json.dumps({"esearchresult": result})
+
+    def efetch(self: object, parameters: dict) -> tuple:
+        parts = [fixtures.DOCTYPE, "<PubmedArticleSet>"]
+        parts += [self.record(pmid) for pmid in self._ids(parameters)]
+        parts.append("</PubmedArticleSet>")
+        return "text/xml", "".join(parts)
+
+    def esummary(self: object, parameters: dict) -> tuple:
+        pmids = self._ids(parameters)
+        result = {"uids": [str(pmid) for pmid in pmids]}
+        for pmid in pmids:
+            result[str(pmid)] = fixtures.summary_record(pmid, self.seed)
+        return "application/json", json.dumps({"result": result})
+
+    def epost(self: object, parameters: dict) -> tuple:
+        pmids, invalid = [], []
+        for pmid in parameters.get("id", "").split(","):
+            valid = pmid.isdigit() and int(pmid) in self._known
+            (pmids if valid else invalid).append(pmid)
+        webenv, query_key = self._store(parameters.get("WebEnv"), [int(p) for p in pmids])
+        invalid = "".join(f"<Id>{pmid}</Id>" for pmid in invalid)
+        return (
+            "text/xml",
+            '<?xml version="1.0" ?><ePostResult>'
+            + (f"<InvalidIdList>{invalid}</InvalidIdList>" if invalid else "")
+            + f"<QueryKey>{query_key}</QueryKey><WebEnv>{webenv}</WebEnv></ePostResult>",
+        )
+
+    def _window(self: object, parameters: dict) -> list:
+        """ Helper method that returns the PMIDs inside mindate/maxdate and the
+            [mdat] range of the term, oldest first.
+        """
+
+        start, end = 0, len(self.pmids)
+        if parameters.get("mindate"):
+            day = datetime.datetime.strptime(parameters["mindate"], "%Y/%m/%d")
+            start = bisect.bisect_left(self.dates, day.toordinal())
+        if parameters.get("maxdate"):
+            day = datetime.datetime.strptime(parameters["maxdate"], "%Y/%m/%d")
+            end = bisect.bisect_right(self.dates, day.toordinal())
+
+        match = MDAT_RANGE.search(parameters.get("term", ""))
+        if match is None:
+            return self.pmids[start:end]
+
+        first, last = (self._ordinal(date) for date in match.groups())
+        with self._lock:
+            return [
+                pmid
+                for pmid, date in zip(self.pmids[start:end], self.dates[start:end])
+                if first <= self._modified.get(pmid, date) <= last
+            ]
+
+    def _ordinal(self: object, date: str) -> int:
+        """ Helper method that returns the day of an E-utilities date (YYYY,
+            YYYY/MM or YYYY/MM/DD, a missing month or day is the first).
+        """
+
+        parts = [int(part) for part in date.split("/")] + [1, 1]
+        return datetime.date(*parts[:3]).toordinal()
+
+    def _ids(self: object, parameters: dict) -> list:
+        """ Helper method that returns the PMIDs selected by an id list or a
+            history server page.
+        """
+
+        if "id" in parameters:
+            return [int(pmid) for pmid in parameters["id"].split(",") if pmid]
+        with self._lock:
+            pmids = self._history[parameters["WebEnv"]][parameters["query_key"]]
+        retstart = int(parameters.get("retstart", 0))
+        return pmids[retstart : retstart + int(parameters.get("retmax", 20))]
+
+    def _store(self: object, webenv: Optional[str], pmids: list) -> tuple:
+        with self._lock:
+            if webenv not in self._history:
+                webenv = f"MOCK_{len(self._history)}"
+                self._history[webenv] = {}
+            query_key = str(len(self._history[webenv]) + 1)
+            self._history[webenv][query_key] = pmids
+        return webenv, query_key
+
+    def _stall(self: object, endpoint: str) -> bool:
+        """ Helper method that decides whether a response stalls mid-body.
+        """
+
+        with self._lock:
+            if endpoint != "efetch" or self.stalls <= 0:
+                return False
+            self.stalls -= 1
+            return True
+
+    def _count(self: object, endpoint: str, key: str, value: int = 1) -> None:
+        with self._lock:
+            counts = self.stats.setdefault(endpoint, {"requests": 0, "errors": 0, "bytes": 0})
+            counts[key] += value
+
+    def _handler(self: object) -> type:
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:
+                self._respond(urlsplit(self.path).query)
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                self._respond(self.rfile.read(length).decode("utf8"))
+
+            def _respond(self, query: str) -> None:
+                path = urlsplit(self.path).path
+                if path == "/mock/stats":
+                    with mock._lock:
+                        return self._send(200, "application/json", json.dumps(mock.stats))
+
+                endpoint = path.rsplit("/", 1)[-1].replace(".fcgi", "")
+                if endpoint not in ("esearch", "efetch", "esummary", "epost"):
+                    return self._send(404, "text/plain", "Unknown endpoint")
+                # Repeated id parameters are joined like a comma separated list
+                parameters = {
+                    key: ",".join(values) if key == "id" else values[-1]
+                    for key, values in parse_qs(query).items()
+                }
+
+                mock._count(endpoint, "requests")
+                delay = mock.latency + mock._random.uniform(0, mock.jitter)
+                if delay:
+                    time.sleep(delay)
+                if mock._random.random() < mock.error_rate:
+                    mock._count(endpoint, "errors")
+                    status = mock._random.choice(mock.error_status)
+                    return self._send(status, "text/plain", "Injected error", {"Retry-After": "0"})
+
+                content_type, body = getattr(mock, endpoint)(parameters)
+                if mock._stall(endpoint):
+                    mock._count(endpoint, "errors")
+                    return self._send(200, content_type, body, stall=True)
+                mock._count(endpoint, "bytes", self._send(200, content_type, body))
+
+            def _send(self, status, content_type, body, headers=None, stall=False) -> int:
+                body = body.encode("utf8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                if mock.compress and "gzip" in self.headers.get("Accept-Encoding", ""):
+                    body = gzip.compress(body, compresslevel=1)
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+
+                # Half of the body, then nothing until the connection is closed
+                if stall:
+                    self.wfile.write(body[: len(body) // 2])
+                    self.wfile.flush()
+                    time.sleep(mock.stall_seconds)
+                    self.close_connection = True
+                    return len(body) // 2
+
+                self.wfile.write(body)
+                return len(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("files", nargs="*", help="recorded efetch XML documents")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--stalls", type=int, default=0)
+    parser.add_argument("--abstract-words", type=int, default=200)
+    parser.add_argument("--references", type=int, default=20)
+    parser.add_argument("--compress", action="store_true")
+    args = parser.parse_args()
+
+    server = MockEutils(
+        count=args.count,
+        recorded=fixtures.load(args.files) if args.files else None,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        stalls=args.stalls,
+        abstract_words=args.abstract_words,
+        references=args.references,
+        compress=args.compress,
+        host=args.host,
+        port=args.port,
+    )
+    server.warm()
+
+    # The first line tells a parent process where to connect
+    print(f"Serving on {server.url}", flush=True)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+from collections import Counter
+import unittest
+
+from benchmarks import fixtures
+from utils.app import App
+from utils.pmq import articleFromSummary
+from utils.record import ArticleRecord
+from utils.text import LemmaTable
+
+
+class SummaryAuthorsTest(unittest.TestCase):
+    """ The authors of esummary records are counted by the App.
+    """
+
+    def setUp(self) -> None:
+        self.app = App()
+
+        # The authors don't need the WordNet data
+        self.app.lemmas = LemmaTable(lemmatize=lambda word: word)
+
+    def records(self, pmids: range, authors: list = None) -> list:
+        records = []
+        for pmid in pmids:
+            record = fixtures.summary_record(pmid)
+            if authors is not None:
+                record["authors"] = authors
+            records.append(ArticleRecord.fromArticle(articleFromSummary(record)))
+        return records
+
+    def test_summary_authors_are_counted(self) -> None:
+        self.app.raw_data = self.records(range(30000000, 30000002), [
+            {"name": "Smith J", "authtype": "Author"},
+            {"name": "Doe AB", "authtype": "Author"},
+            {"name": "COVID Study Group", "authtype": "CollectiveName"},
+        ])
+        self.app.clean_data()
+
+        self.assertEqual(self.app.authors_cloud_words, Counter({"j_smith": 2, "ab_doe": 2}))
+
+    def test_summary_mode_keeps_all_authors(self) -> None:
+        records = self.records(range(30000000, 30000040))
+        self.app.raw_data = records
+        self.app.clean_data()
+
+        authors = sum(len(record.authors) for record in records)
+        self.assertGreater(authors, 0)
+        self.assertEqual(sum(self.app.authors_cloud_words.values()), authors)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from benchmarks import fixtures
+from utils.bulk import loadBulk
+
+
+class LazyBulkTest(unittest.TestCase):
+    """ Lazy articles parsed in worker processes come back serialized.
+    """
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.paths = []
+        for number, first in enumerate((30000000, 30000050)):
+            path = os.path.join(directory.name, "pubmed25n%04d.xml.gz" % (number + 1))
+            with gzip.open(path, "wb") as xml_file:
+                xml_file.write(fixtures.efetch_xml(range(first, first + 50)))
+            self.paths.append(path)
+
+    def test_lazy_articles_keep_their_source(self) -> None:
+        articles = list(loadBulk(self.paths, processes=2, lazy=True))
+        expected = {article._pmid: article for article in loadBulk(self.paths, processes=1)}
+
+        self.assertEqual(len(articles), 100)
+        for article in articles:
+            self.assertIsInstance(object.__getattribute__(article, "_source"), bytes)
+            with self.assertRaises(AttributeError):
+                object.__getattribute__(article, "title")
+
+            # The fields are still extracted on first access
+            self.assertEqual(article.title, expected[article._pmid].title)
+
+
+if __name__ == "__main__":
+    unittest.main()
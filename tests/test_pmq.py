@@ -0,0 +1,264 @@
+import itertools
+import os
+import socket
+import tempfile
+import unittest
+from unittest import mock
+
+import requests
+
+from benchmarks import fixtures
+from benchmarks.bench_parse import articleFromPaths, bookFromPaths
+from benchmarks.mock_eutils import MockEutils
+from utils.cache import ArticleCache, SyncStore
+from utils.pmq import PubMedArticle, PubMedQuery, articleFromElement, iterArticleElements
+
+
+class MockTestCase(unittest.TestCase):
+    """ Starts a mock server with small records for every test.
+    """
+
+    count = 50
+
+    def setUp(self) -> None:
+        self.server = MockEutils(count=self.count, abstract_words=5, references=0)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+
+        self.ids = [str(pmid) for pmid in self.server.pmids]
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def query(self, **kwargs) -> PubMedQuery:
+        pmq = PubMedQuery(
+            email="test@example.org", base_url=self.server.url, rate_limit=1000, **kwargs
+        )
+        self.addCleanup(pmq.close)
+        return pmq
+
+    def requests(self, endpoint: str) -> int:
+        return self.server.stats.get(endpoint, {}).get("requests", 0)
+
+
+class StalledStreamTest(unittest.TestCase):
+    """ An efetch response that stops in the middle of its body is retried.
+    """
+
+    def setUp(self) -> None:
+        self.server = MockEutils(count=50, stalls=1, stall_seconds=2)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+
+        # No backoff between the attempts
+        patcher = mock.patch("utils.pmq.backoffDelay", return_value=0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.ids = [str(pmid) for pmid in self.server.pmids[:20]]
+
+    def query(self) -> PubMedQuery:
+        pmq = PubMedQuery(
+            email="test@example.org",
+            base_url=self.server.url,
+            rate_limit=1000,
+            timeout=(2, 0.5),
+        )
+        self.addCleanup(pmq.close)
+        return pmq
+
+    def test_stalled_batch_is_retried(self) -> None:
+        pmq = self.query()
+        articles = list(pmq.query_ids(",".join(self.ids)))
+
+        self.assertEqual([article._pmid for article in articles], self.ids)
+        self.assertEqual(self.server.stats["efetch"]["requests"], 2)
+        self.assertEqual(pmq._transfer.timeouts, 1)
+
+    def test_stalled_batch_is_not_skipped(self) -> None:
+        pmq = self.query()
+        articles = list(pmq.query_ids(",".join(self.ids), skip_failed=True))
+
+        self.assertEqual(len(articles), len(self.ids))
+        self.assertEqual(pmq.failed_batches, [])
+
+
+class RefusedConnectionTest(unittest.TestCase):
+    """ A request that can't connect is only retried by _get, not again for
+        its batch.
+    """
+
+    def test_connection_errors_are_retried_once(self) -> None:
+        with socket.socket() as closed:
+            closed.bind(("127.0.0.1", 0))
+            url = "http://127.0.0.1:%d" % closed.getsockname()[1]
+
+        pmq = PubMedQuery(email="test@example.org", base_url=url, rate_limit=1000, max_retries=2)
+        self.addCleanup(pmq.close)
+        request = mock.Mock(wraps=pmq._session.request)
+
+        with mock.patch("utils.pmq.backoffDelay", return_value=0), mock.patch.object(pmq._session, "request", request):
+            for summary in (False, True):
+                request.reset_mock()
+                with self.assertRaises(requests.ConnectionError):
+                    list(pmq.query_ids("1,2,3", summary=summary))
+                self.assertEqual(request.call_count, 3)
+                self.assertEqual(pmq._transfer.timeouts, 0)
+
+
+class DateWindowTest(MockTestCase):
+    """ A search with more results than esearch returns is split into date
+        windows that together return every result once.
+    """
+
+    count = 12000
+
+    def test_windows_return_every_result_once(self) -> None:
+        pmq = self.query()
+        articles = list(pmq.query("cancer", max_results=-1, workers=4, summary=True))
+        pmids = [article._pmid for article in articles]
+
+        self.assertEqual(len(pmids), len(set(pmids)))
+        self.assertEqual(set(pmids), set(self.ids))
+        self.assertEqual(pmq.truncated_windows, [])
+
+
+class CheckpointTest(MockTestCase):
+    """ A download that is interrupted resumes after its completed batches.
+    """
+
+    def resume(self, download) -> list:
+        """ Take 15 articles of the first download, then run it again with the
+            same checkpoint. Returns the PMIDs of both downloads.
+        """
+
+        path = os.path.join(self.directory, "download.jsonl")
+        first = download(path)
+        returned = [article._pmid for article in itertools.islice(first, 15)]
+        first.close()
+        return returned, [article._pmid for article in download(path)]
+
+    def test_id_batches_resume(self) -> None:
+        pmq = self.query()
+        returned, resumed = self.resume(
+            lambda path: pmq.query_ids(",".join(self.ids), checkpoint=path, batch_size=10)
+        )
+
+        self.assertEqual(returned, self.ids[:15])
+        self.assertEqual(resumed, self.ids[10:])
+
+    def test_history_ranges_resume(self) -> None:
+        pmq = self.query()
+        returned, resumed = self.resume(
+            lambda path: pmq.query(
+                "cancer", max_results=-1, use_history=True, checkpoint=path, batch_size=10
+            )
+        )
+
+        newest_first = self.ids[::-1]
+        self.assertEqual(returned, newest_first[:15])
+        self.assertEqual(resumed, newest_first[10:])
+
+
+class ArticleCacheTest(MockTestCase):
+    """ Cached articles are merged into the downloaded ones in the order of the
+        IDs, only the missing ones are downloaded.
+    """
+
+    def test_hits_keep_the_order(self) -> None:
+        cache = ArticleCache(os.path.join(self.directory, "articles.db"))
+        self.addCleanup(cache.close)
+        pmq = self.query(cache=cache)
+        ids = self.ids[:20]
+
+        # Every other article is cached, including the first and not the last
+        list(pmq.query_ids(",".join(ids[::2])))
+        articles = list(pmq.query_ids(",".join(ids)))
+
+        self.assertEqual([article._pmid for article in articles], ids)
+        self.assertEqual(self.requests("efetch"), 2)
+        self.assertEqual(len(cache), 20)
+
+    def test_all_hits(self) -> None:
+        cache = ArticleCache(os.path.join(self.directory, "articles.db"))
+        self.addCleanup(cache.close)
+        pmq = self.query(cache=cache)
+        ids = self.ids[:10]
+
+        list(pmq.query_ids(",".join(ids)))
+        articles = list(pmq.query_ids(",".join(reversed(ids))))
+
+        self.assertEqual([article._pmid for article in articles], ids[::-1])
+        self.assertEqual(self.requests("efetch"), 1)
+
+
+class IdFileTest(MockTestCase):
+    """ The IDs of a file are posted once each, in the order they first occur.
+    """
+
+    def test_duplicates_are_left_out(self) -> None:
+        path = os.path.join(self.directory, "ids.txt")
+        with open(path, "w", encoding="utf8") as id_file:
+            id_file.write(f"{self.ids[2]}, {self.ids[0]}\n{self.ids[2]}\n\n")
+            id_file.write(f"{self.ids[1]} {self.ids[0]},{self.ids[3]}\n")
+
+        pmq = self.query()
+        articles = list(pmq.query_id_file(path))
+
+        self.assertEqual(
+            [article._pmid for article in articles],
+            [self.ids[2], self.ids[0], self.ids[1], self.ids[3]],
+        )
+        self.assertEqual(self.requests("epost"), 1)
+
+
+class SyncTest(MockTestCase):
+    """ A sync downloads the new articles and the ones revised since the last
+        sync.
+    """
+
+    def test_revised_articles_are_changed(self) -> None:
+        store = SyncStore(os.path.join(self.directory, "searches.json"))
+        pmq = self.query()
+
+        first = pmq.sync("saved", "cancer", store)
+        self.assertEqual(first.added, self.ids)
+        self.assertEqual((first.changed, first.removed), ([], []))
+        self.assertEqual(len(first.articles), len(self.ids))
+
+        unchanged = pmq.sync("saved", "cancer", store)
+        self.assertEqual(unchanged, ([], [], [], []))
+
+        self.server.modify(self.server.pmids[5:8])
+        second = pmq.sync("saved", "cancer", store)
+        self.assertEqual(second.added, [])
+        self.assertEqual(second.changed, self.ids[5:8])
+        self.assertEqual(second.removed, [])
+        self.assertEqual([article._pmid for article in second.articles], self.ids[5:8])
+
+
+class SinglePassTest(unittest.TestCase):
+    """ The single pass extracts the same fields as one path lookup per field.
+    """
+
+    def test_single_pass_matches_the_paths(self) -> None:
+        document = fixtures.efetch_xml(range(30000000, 30000100))
+        elements = list(iterArticleElements([document]))
+        self.assertTrue(any(element.tag == "PubmedBookArticle" for element in elements))
+
+        for element in elements:
+            article = articleFromElement(element)
+            if isinstance(article, PubMedArticle):
+                reference = articleFromPaths(element)
+            else:
+                reference = bookFromPaths(element)
+            for field in type(article).__slots__:
+                if field != "xml":
+                    self.assertEqual(
+                        getattr(article, field), getattr(reference, field), field
+                    )
+
+
+if __name__ == "__main__":
+    unittest.main()
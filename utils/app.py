@@ -1,41 +1,73 @@
 from collections import Counter
 from IPython.display import clear_output, display 
-import itertools
 import ipywidgets as widgets
 import json
 import matplotlib.pyplot as plt
-from nltk.stem import WordNetLemmatizer
-from nltk.tokenize import word_tokenize
 from nltk.util import ngrams, everygrams
 import numpy as np
 import re
 from urllib.error import HTTPError
 from wordcloud import WordCloud
+from .cache import ArticleCache, ProcessingCache, SearchCache
 from .pmq import PubMedQuery
+from .record import ArticleRecord
+from .text import LemmaTable, TextNormalizer, tokenize
+
+# Words as WordCloud.generate splits them out of a text
+CLOUD_WORD = re.compile(r"\w[\w']*")
+
+# Article fields read by clean_data, the XML element is not kept
+ARTICLE_FIELDS = (
+    'pubmed_id',
+    'title',
+    'journal',
+    'authors',
+    'abstract',
+    'results',
+    'keywords',
+    'conclusions',
+    'publication_date',
+)
 
 class App(object):
 
-    def __init__(self):
+    def __init__(self, cache_path=None, lemma_path=None):
+
+        # Optional local store of downloaded articles, shared by all searches
+        self.article_cache = ArticleCache(cache_path) if cache_path else None
+
+        # IDs of previous searches, repeated searches skip esearch
+        self.search_cache = SearchCache()
+
+        # Processed fields per PMID and settings, reused across clicks and searches
+        self.processing_cache = ProcessingCache()
+        self._cleaned_key = None
 
         with open('utils/stopWords.json', encoding="utf8") as json_file:
             self.stopWords = json.load(json_file)['words']
 
+        # Cleaning, stopwords and tokenization in one pass over the text
+        self.normalizer = TextNormalizer(self.stopWords)
+
+        # Lemmas of the words seen so far, optionally kept between sessions
+        self.lemmas = LemmaTable(path=lemma_path)
+
         self.search_ids = []
 
         self.raw_data = []
         self.cleanedData = []
 
         self.cleanedData = []
-        self.authors_cloud_words = []
-        self.title_cloud_words = []
-        self.journal_cloud_words = []
-        self.abstract_cloud_words = []
-        self.result_cloud_words = []
-        self.publication_year_cloud_words = []
-        self.keyword_cloud_words = []
-        self.conclusion_cloud_words = []
-        self.publication_cloud_words = []
-        self.overal_cloud_words = []
+        self.authors_cloud_words = Counter()
+        self.title_cloud_words = Counter()
+        self.journal_cloud_words = Counter()
+        self.abstract_cloud_words = Counter()
+        self.result_cloud_words = Counter()
+        self.publication_year_cloud_words = Counter()
+        self.keyword_cloud_words = Counter()
+        self.conclusion_cloud_words = Counter()
+        self.publication_cloud_words = Counter()
+        self.overal_cloud_words = Counter()
 
         self.min_grams = widgets.IntSlider(
             value=2,
@@ -245,20 +277,30 @@ class App(object):
             if self._validate_mail():
                 clear_output()
                 print('Downloading data')
-                pmq = PubMedQuery(email=self.email_field.value)
+                with PubMedQuery(email=self.email_field.value, cache=self.article_cache, search_cache=self.search_cache, fields=ARTICLE_FIELDS) as pmq:
+
+                    # A batch that keeps failing doesn't discard the other batches
+                    results = pmq.query_ids(id_string=self.search_ids_field.value, skip_failed=True)
 
-                results = pmq.query_ids(id_string=self.search_ids_field.value)
+                    try:
+                        for article in results:
+                            self.raw_data.append(ArticleRecord.fromArticle(article))
+                    except:
+                        clear_output()
+                        print('Please provide valid PubMedIDs')
+                        return None
 
-                try:
-                    for article in results:
-                        self.raw_data.append(article.toJSON()) 
-                except:
+                    failed_batches = len(pmq.failed_batches)
+
+                if failed_batches and not self.raw_data:
                     clear_output()
                     print('Please provide valid PubMedIDs')
                     return None
 
                 clear_output()
                 print('Downloaded publications based on your search term: {}'.format(len(self.raw_data)))
+                if failed_batches:
+                    print('Batches that could not be downloaded: {}'.format(failed_batches))
                 display(self.cloud_box)
             else: 
                 clear_output()
@@ -271,73 +313,40 @@ class App(object):
                 clear_output()
                 print('Downloading data')
 
-                pmq = PubMedQuery(email=self.email_field.value)
+                with PubMedQuery(email=self.email_field.value, cache=self.article_cache, search_cache=self.search_cache, fields=ARTICLE_FIELDS) as pmq:
                 
-                try:
-                    results = pmq.query(query=self.search_term_field.value, max_results=self.max_results.value)
-                except:
-                    clear_output()
-                    print('Please provide a search term')
-                    return None
-
-                for article in results:
-                    self.raw_data.append(article.toJSON()) 
+                    # The search runs while the results are read
+                    try:
+                        results = pmq.query(query=self.search_term_field.value, max_results=self.max_results.value, skip_failed=True)
+                        for article in results:
+                            self.raw_data.append(ArticleRecord.fromArticle(article))
+                    except:
+                        clear_output()
+                        print('Please provide a search term')
+                        return None
+
+                    failed_batches = len(pmq.failed_batches)
 
                 clear_output()
                 print('Downloaded publications based on your search term: {}'.format(len(self.raw_data)))
+                if failed_batches:
+                    print('Batches that could not be downloaded: {}'.format(failed_batches))
                 display(self.cloud_box)
             else: 
                 clear_output()
                 print('Please enter a valid email address')
         
     
+    def export_json(self, path):
+        with open(path, 'w', encoding="utf8") as json_file:
+            json.dump([record.toDict() for record in self.raw_data], json_file, indent=4, sort_keys=True, default=str)
+
     def stringify_search_ids(self):
         return ', '.join(self.search_ids)
     
     def listify_search_ids(self):
         return self.search_ids_field.value.replace(' ', '').replace('\n', '').split(',')
 
-    def _clean_text(self, ct_text):
-
-        if ct_text:
-            ct_text_list = ct_text.split()
-            ct_cleaned_text_list = []
-
-            for ct_element in ct_text_list:
-                if self.remove_isolated_numbers.value:
-                    ct_element = re.sub(r"\b(\d+|[a-z])\b *","",ct_element)
-                ct_element = re.sub('[^a-zA-Z0-9 .,]|(?<!\\d)[.,]|[.,](?!\\d)', '', ct_element)
-                ct_element = ct_element.replace(' ', '')
-
-                if ct_element is not '':
-                    ct_cleaned_text_list.append(ct_element.lower())
-
-            return ' '.join(ct_cleaned_text_list)
-        return ''
-
-    def _remove_stopwords(self, rs_text):
-
-        rs_text_list = rs_text.split()
-        rs_cleaned_text_list = []
-
-        for rs_element in rs_text_list:
-            if rs_element.lower() not in self.stopWords:
-                rs_cleaned_text_list.append(rs_element)
-
-        return ' '.join(rs_cleaned_text_list)
-
-    def _stem_text(self, st_text):
-
-        stemmer = WordNetLemmatizer()
-
-        st_text_list = st_text.split()
-        st_cleaned_text_list = []
-
-        for st_element in st_text_list:
-            st_cleaned_text_list.append(stemmer.lemmatize(st_element))
-        
-        return ' '.join(st_cleaned_text_list)
-
     def _underscore_join(self, uj_text):
         return '_'.join(uj_text.split())
 
@@ -351,6 +360,9 @@ class App(object):
                 if 'firstname' in t_author and t_author['firstname']:
                     firstname = t_author['firstname'].replace(' ', '_')
                     firstname = firstname.replace('-', '_')
+                elif 'initials' in t_author and t_author['initials']:
+                    # esummary authors only have their initials
+                    firstname = t_author['initials']
                 if 'lastname' in t_author and t_author['lastname']:
                     lastname = t_author['lastname'].replace(' ', '_')
                     lastname = lastname.replace('-', '_')
@@ -367,47 +379,79 @@ class App(object):
 
         return ''
 
-    def _tokenice(self, t_text):
-        nltk_tokens = word_tokenize(t_text)
-        every_gram_list = list(everygrams(nltk_tokens, min_len=self.min_grams.value, max_len=self.max_grams.value))
-        return(every_gram_list)
-
     def _data_process(self, dp_text):
 
-        dp_text = self._clean_text(dp_text)
-        dp_text = self._remove_stopwords(dp_text)
-        dp_text = self._stem_text(dp_text)
-        dp_text = self._tokenice(dp_text)
-        dp_text = ['_'.join(w) for w in dp_text]
+        dp_text = self._normalize_text(dp_text)
+        dp_text = self._gram_text(dp_text)
 
         return dp_text
 
+    def _normalize_text(self, nt_text):
+
+        nt_words = self.normalizer.words(nt_text, self.remove_isolated_numbers.value)
+
+        return self.lemmas.lemmatizeWords(nt_words)
+
+    def _gram_text(self, gt_words):
+        gt_tokens = tokenize(gt_words)
+        return ['_'.join(w) for w in everygrams(gt_tokens, min_len=self.min_grams.value, max_len=self.max_grams.value)]
+
+    def _cached_process(self, cp_pmid, cp_field, cp_text):
+
+        # Without a PMID the field can't be cached
+        if not cp_pmid:
+            return self._data_process(cp_text)
+
+        # Every stage only depends on its own settings, a new n-gram range
+        # reuses the normalized text
+        numbers = self.remove_isolated_numbers.value
+        normalized = self.processing_cache.get((cp_pmid, cp_field, 'normalize', numbers), cp_text, self._normalize_text)
+        return self.processing_cache.get((cp_pmid, cp_field, 'grams', numbers, self.min_grams.value, self.max_grams.value), normalized, self._gram_text)
+
     def _keywords_process(self, kp_list):
 
         cleaned_keywords = []
 
         for keyword_phrase in kp_list:
-            keyword_phrase = self._clean_text(keyword_phrase)
-            keyword_phrase = self._remove_stopwords(keyword_phrase)
-            keyword_phrase = self._stem_text(keyword_phrase)
+            keyword_phrase = self._normalize_text(keyword_phrase)
 
-            cleaned_keywords.append(keyword_phrase.replace(' ', '_'))
+            cleaned_keywords.append('_'.join(keyword_phrase))
 
         return(cleaned_keywords)
 
-    def _long_gram_weight(self, lgw_list):
-        weight_list = []
+    def _long_gram_weight(self, lgw_counts):
 
-        for lgw_entry in lgw_list:
-            weight = len(lgw_entry.split('_'))
-            for _ in itertools.repeat(None, weight):
-                weight_list.append(lgw_entry)
-        
-        return(weight_list)
+        # Every n-gram counts once per word it consists of
+        return Counter({lgw_entry: lgw_count * (lgw_entry.count('_') + 1) for lgw_entry, lgw_count in lgw_counts.items()})
+
+    def _cloud_frequencies(self, cf_wordcloud, cf_counts):
+
+        # The frequencies WordCloud.generate counts in the text of all the
+        # occurrences, computed once per distinct word: split at other
+        # characters, without numbers, stopwords and "'s". The words are lower
+        # case already, so only the plurals are merged into their singulars
+        cf_stopwords = set(cf_word.lower() for cf_word in cf_wordcloud.stopwords)
+        cf_frequencies = Counter()
+
+        for cf_entry, cf_count in cf_counts.items():
+            for cf_word in CLOUD_WORD.findall(cf_entry):
+                if cf_word.lower().endswith("'s"):
+                    cf_word = cf_word[:-2]
+                if not cf_word.isdigit() and cf_word.lower() not in cf_stopwords:
+                    cf_frequencies[cf_word] += cf_count
+
+        for cf_word in list(cf_frequencies):
+            if cf_word.endswith('s') and not cf_word.endswith('ss') and cf_word[:-1] in cf_frequencies:
+                cf_frequencies[cf_word[:-1]] += cf_frequencies.pop(cf_word)
+
+        return cf_frequencies
 
     def generate_wordcloud(self, cloud_words):
-        if len(cloud_words) > 0:
-            wordcloud = WordCloud(max_words=self.cloud_size.value, width=900, height=600, background_color="white", collocations=False).generate(cloud_words)
+        wordcloud = WordCloud(max_words=self.cloud_size.value, width=900, height=600, background_color="white", collocations=False)
+        cloud_frequencies = self._cloud_frequencies(wordcloud, cloud_words)
+
+        if len(cloud_frequencies) > 0:
+            wordcloud.generate_from_frequencies(cloud_frequencies)
             plt.figure(figsize = (15, 10), facecolor = None)
             plt.imshow(wordcloud, interpolation='bilinear')
             plt.axis("off")
@@ -444,11 +488,11 @@ class App(object):
         print('Publication Year Chart:')
         self.generate_publication_year_chart(self.publication_year_cloud_words)
 
-    def generate_journal_chart(self, ch_authors):
+    def generate_journal_chart(self, ch_journals):
 
         journal_list = []
         frequency_list = []
-        most_common_journals = Counter(ch_authors.split()).most_common(self.top_journals.value)
+        most_common_journals = ch_journals.most_common(self.top_journals.value)
 
         for entry in most_common_journals:
             journal_list.append(entry[0].replace('_', ' '))
@@ -467,11 +511,10 @@ class App(object):
 
     def generate_publication_year_chart(self, ch_years):
 
-        ch_years = ' '.join(sorted(str(ch_years).split()))
         year_list = []
         frequency_list = []
 
-        history = Counter(ch_years.split()).items()
+        history = sorted(ch_years.items())
 
         for entry in history:
             year_list.append(entry[0])
@@ -488,31 +531,42 @@ class App(object):
 
         plt.show()
     
-    def _remove_ignorewords(self, ri_list):
+    def _remove_ignorewords(self, ri_counts):
 
         ignore_words = self.ignore_words_field.value.replace(' ', '').replace('\n', '').split(',')
 
-        ri_cleaned_list = []
+        for ri_element in ignore_words:
+            ri_counts.pop(ri_element, None)
 
-        for ri_element in ri_list:
-            if ri_element not in ignore_words:
-                ri_cleaned_list.append(ri_element)
-
-        return ri_cleaned_list
+        return ri_counts
     
     def clean_data(self):
 
+        # Only rendering settings changed, the cloud words are still valid
+        cleaned_key = (
+            self.remove_isolated_numbers.value,
+            self.min_grams.value,
+            self.max_grams.value,
+            self.ignore_incomplete_author_names.value,
+            self.long_grams_weight.value,
+            self.ignore_words_field.value,
+            len(self.raw_data),
+        )
+        if self._cleaned_key is not None and self._cleaned_key[0] is self.raw_data and self._cleaned_key[1] == cleaned_key:
+            return
+        self._cleaned_key = None
+
         self.cleanedData = []
-        self.authors_cloud_words = []
-        self.title_cloud_words = []
-        self.journal_cloud_words = []
-        self.abstract_cloud_words = []
-        self.result_cloud_words = []
-        self.publication_year_cloud_words = []
-        self.keyword_cloud_words = []
-        self.conclusion_cloud_words = []
-        self.publication_cloud_words = []
-        self.overal_cloud_words = []
+        self.authors_cloud_words = Counter()
+        self.title_cloud_words = Counter()
+        self.journal_cloud_words = Counter()
+        self.abstract_cloud_words = Counter()
+        self.result_cloud_words = Counter()
+        self.publication_year_cloud_words = Counter()
+        self.keyword_cloud_words = Counter()
+        self.conclusion_cloud_words = Counter()
+        self.publication_cloud_words = Counter()
+        self.overal_cloud_words = Counter()
 
         for entry in self.raw_data:
 
@@ -533,37 +587,43 @@ class App(object):
             result_tokens = ''
             conclusion_tokens = ''
 
-            key_list = []
-
-            # ToDo: delete TestPrint
-            for key, value in json.loads(entry).items():
-                key_list.append(key)
-
-            if 'pubmed_id' in key_list:
-                pubmed_id = json.loads(entry)['pubmed_id']
-            if 'title' in key_list:  
-                title = json.loads(entry)['title']
-                title_tokens = self._data_process(title)
-            if 'journal' in key_list:
-                journal = self._underscore_join(json.loads(entry)['journal'])
-            if 'authors' in key_list:
-                authors = json.loads(entry)['authors']
-                author_tokens = self._tokenize_authors(authors) 
-            if 'abstract' in key_list:
-                abstract = json.loads(entry)['abstract'] 
-                abstract_tokens = self._data_process(abstract)
-            if 'results' in key_list:
-                results = json.loads(entry)['results'] 
-                result_tokens = self._data_process(results)
-            if 'keywords' in key_list:
-                keywords = json.loads(entry)['keywords'] 
-                keyword_tokens = self._keywords_process(keywords)
-            if 'conclusions' in key_list:
-                conclusions = json.loads(entry)['conclusions'] 
-                conclusion_tokens = self._data_process(conclusions)
-            if 'publication_date' in key_list:
-                publication_date = json.loads(entry)['publication_date']
-                publication_year = json.loads(entry)['publication_date'].split('-')[0]
+            # The pubmed_id also lists the PMIDs of the references
+            pmid = entry.pubmed_id.split('\n', 1)[0] if entry.pubmed_id else None
+            numbers = self.remove_isolated_numbers.value
+            complete_names = self.ignore_incomplete_author_names.value
+
+            # Fields the article doesn't have are None in the record
+            if entry.pubmed_id is not None:
+                pubmed_id = entry.pubmed_id
+            if entry.title is not None:
+                title = entry.title
+                title_tokens = self._cached_process(pmid, 'title', title)
+            if entry.journal is not None:
+                journal = self._underscore_join(entry.journal)
+            if entry.authors is not None:
+                authors = entry.authors
+                if pmid:
+                    author_tokens = self.processing_cache.get((pmid, 'authors', complete_names), authors, self._tokenize_authors)
+                else:
+                    author_tokens = self._tokenize_authors(authors)
+            if entry.abstract is not None:
+                abstract = entry.abstract
+                abstract_tokens = self._cached_process(pmid, 'abstract', abstract)
+            if entry.results is not None:
+                results = entry.results
+                result_tokens = self._cached_process(pmid, 'results', results)
+            if entry.keywords is not None:
+                keywords = entry.keywords
+                if pmid:
+                    keyword_tokens = self.processing_cache.get((pmid, 'keywords', numbers), keywords, self._keywords_process)
+                else:
+                    keyword_tokens = self._keywords_process(keywords)
+            if entry.conclusions is not None:
+                conclusions = entry.conclusions
+                conclusion_tokens = self._cached_process(pmid, 'conclusions', conclusions)
+            if entry.publication_date is not None:
+                publication_date = entry.publication_date
+                publication_year = entry.publication_year
             
             self.cleanedData.append({
                 'pmid': pubmed_id,
@@ -585,84 +645,72 @@ class App(object):
             })
 
 
-        authors_list = []
-        title_list = []
-        journal_list = []
-        abstract_list = []
-        result_list = []
-        publication_year_list = []
-        keyword_list = []
-        conclusion_list = []
-
-        publication_list = []
-        overall_list = []
+        # Frequencies of the words, the title, abstract, result, keyword and
+        # conclusion clouds count every word once per publication (a word in
+        # the title and the abstract counts twice in the publication cloud)
+        authors_counts = Counter()
+        title_counts = Counter()
+        journal_counts = Counter()
+        abstract_counts = Counter()
+        result_counts = Counter()
+        publication_year_counts = Counter()
+        keyword_counts = Counter()
+        conclusion_counts = Counter()
+        publication_counts = Counter()
+        overall_counts = Counter()
 
         for c_entry in self.cleanedData:
-            authors_list.append(c_entry['author_tokens'])
-            title_list.append(list(set(c_entry['title_tokens'])))
-            journal_list.append(c_entry['journal'])
-            abstract_list.append(list(set(c_entry['abstract_tokens'])))
-            result_list.append(list(set(c_entry['result_tokens'])))
-            publication_year_list.append(c_entry['publication_year'])
-            keyword_list.append(list(set(c_entry['keyword_tokens'])))
-            conclusion_list.append(list(set(c_entry['conclusion_tokens'])))
-
-            temp_publication_list = []
-            temp_publication_list.append(list(set(c_entry['title_tokens'])))
-            temp_publication_list.append(list(set(c_entry['abstract_tokens'])))
-            temp_publication_list.append(list(set(c_entry['result_tokens'])))
-            temp_publication_list.append(list(set(c_entry['keyword_tokens'])))
-            temp_publication_list.append(list(set(c_entry['conclusion_tokens'])))
-
-            publication_list.append(sum(temp_publication_list, []))
-
-            if len(c_entry['title_tokens']) > 0:
-                overall_list.append(c_entry['title_tokens'])
-            if len(c_entry['abstract_tokens']) > 0:
-                overall_list.append(c_entry['abstract_tokens'])
-            if len(c_entry['result_tokens']) > 0:
-                overall_list.append(c_entry['result_tokens'])
-            if len(c_entry['keyword_tokens']) > 0:
-                overall_list.append(c_entry['keyword_tokens'])
-            if len(c_entry['conclusion_tokens']) > 0:
-                overall_list.append(c_entry['conclusion_tokens'])
-
-
-        title_list = sum(title_list, [])
-        abstract_list = sum(abstract_list, [])
-        result_list = sum(result_list, [])
-        keyword_list = sum(keyword_list, [])
-        conclusion_list = sum(conclusion_list, [])
-        publication_list = sum(publication_list, [])
-        overall_list = sum(overall_list, [])
-
-        title_list = self._remove_ignorewords(title_list)
-        authors_list = self._remove_ignorewords(authors_list)
-        abstract_list = self._remove_ignorewords(abstract_list)
-        result_list = self._remove_ignorewords(result_list)
-        keyword_list = self._remove_ignorewords(keyword_list)
-        conclusion_list = self._remove_ignorewords(conclusion_list)
-        publication_list = self._remove_ignorewords(publication_list)
-        overall_list = self._remove_ignorewords(overall_list)
+            authors_counts.update(c_entry['author_tokens'].split())
+
+            for c_counts, c_field in (
+                (title_counts, 'title_tokens'),
+                (abstract_counts, 'abstract_tokens'),
+                (result_counts, 'result_tokens'),
+                (keyword_counts, 'keyword_tokens'),
+                (conclusion_counts, 'conclusion_tokens'),
+            ):
+                c_tokens = set(c_entry[c_field])
+                c_counts.update(c_tokens)
+                publication_counts.update(c_tokens)
+                overall_counts.update(c_entry[c_field])
+
+            if c_entry['journal']:
+                journal_counts[c_entry['journal']] += 1
+            if c_entry['publication_year']:
+                publication_year_counts[c_entry['publication_year']] += 1
+
+        title_counts = self._remove_ignorewords(title_counts)
+        authors_counts = self._remove_ignorewords(authors_counts)
+        abstract_counts = self._remove_ignorewords(abstract_counts)
+        result_counts = self._remove_ignorewords(result_counts)
+        keyword_counts = self._remove_ignorewords(keyword_counts)
+        conclusion_counts = self._remove_ignorewords(conclusion_counts)
+        publication_counts = self._remove_ignorewords(publication_counts)
+        overall_counts = self._remove_ignorewords(overall_counts)
 
         if self.long_grams_weight.value:
-            title_list = self._long_gram_weight(title_list)
-            abstract_list = self._long_gram_weight(abstract_list)
-            result_list = self._long_gram_weight(result_list)
-            conclusion_list = self._long_gram_weight(conclusion_list)
-            publication_list = self._long_gram_weight(publication_list)
-            overall_list = self._long_gram_weight(overall_list)
-
-        self.authors_cloud_words = ' '.join(authors_list)
-        self.title_cloud_words = ' '.join(title_list)
-        self.journal_cloud_words = ' '.join(journal_list)
-        self.abstract_cloud_words = ' '.join(abstract_list)
-        self.result_cloud_words = ' '.join(result_list)
-        self.publication_year_cloud_words = ' '.join(publication_year_list)
-        self.keyword_cloud_words = ' '.join(keyword_list)
-        self.conclusion_cloud_words = ' '.join(conclusion_list)
-        self.publication_cloud_words = ' '.join(publication_list)
-        self.overal_cloud_words = ' '.join(overall_list)
+            title_counts = self._long_gram_weight(title_counts)
+            abstract_counts = self._long_gram_weight(abstract_counts)
+            result_counts = self._long_gram_weight(result_counts)
+            conclusion_counts = self._long_gram_weight(conclusion_counts)
+            publication_counts = self._long_gram_weight(publication_counts)
+            overall_counts = self._long_gram_weight(overall_counts)
+
+        self.authors_cloud_words = authors_counts
+        self.title_cloud_words = title_counts
+        self.journal_cloud_words = journal_counts
+        self.abstract_cloud_words = abstract_counts
+        self.result_cloud_words = result_counts
+        self.publication_year_cloud_words = publication_year_counts
+        self.keyword_cloud_words = keyword_counts
+        self.conclusion_cloud_words = conclusion_counts
+        self.publication_cloud_words = publication_counts
+        self.overal_cloud_words = overall_counts
+
+        self._cleaned_key = (self.raw_data, cleaned_key)
+
+        # Keep the new lemmas for the next session
+        self.lemmas.save()
 
 
     
@@ -0,0 +1,143 @@
+from concurrent.futures import ProcessPoolExecutor
+import functools
+import gzip
+import os
+from typing import Iterable, Iterator, Optional
+
+from .pmq import (
+    ARTICLE_ELEMENTS,
+    CHUNK_SIZE,
+    PmidSet,
+    PubMedArticle,
+    articleFromElement,
+    elementPmid,
+    imapBounded,
+    iterArticleElements,
+)
+
+
+# Top level elements of baseline and update files
+BULK_ELEMENTS = ARTICLE_ELEMENTS | {"DeleteCitation"}
+
+
+def loadBulk(
+    paths: Iterable[str],
+    processes: Optional[int] = None,
+    keep_xml: bool = False,
+    fields: Optional[Iterable[str]] = None,
+    lazy: bool = False,
+) -> Iterator:
+    """ Load articles from PubMed baseline and update files (pubmedNNnNNNN.xml.gz),
+        the files are parsed in parallel by a pool of processes. Only the latest
+        version of every article is returned, and articles removed by the
+        DeleteCitation entries of a later update file are left out.
+        Parameters:
+            - paths         Iterable, baseline and update files in publication
+                            order (baseline first, gzip compressed or plain XML).
+            - processes     Int, number of parsing processes (defaults to the
+                            number of CPUs, 1 parses in this process).
+            - keep_xml      Bool, keep the XML element on PubMedArticle objects
+                            (it has to be sent back from the parsing process).
+            - fields        Iterable, the fields to extract (None: all).
+            - lazy          Bool, return the articles as serialized XML and
+                            extract their fields on first access.
+        Returns:
+            - articles      Iterator, PubMedArticle / PubMedBookArticle objects,
+                            the newest files first.
+    """
+
+    # Newest files first, a PMID that was already seen is outdated or deleted
+    paths = list(reversed(list(paths)))
+    seen = PmidSet()
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    if processes <= 1:
+        results = (parseBulkFile(path, keep_xml, fields, lazy) for path in paths)
+        yield from applyNewest(results, seen)
+        return
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        results = imapBounded(
+            functools.partial(
+                parseBulkFile, keep_xml=keep_xml, fields=fields, lazy=lazy
+            ),
+            paths,
+            executor,
+            inflight=processes + 1,
+        )
+        yield from applyNewest(results, seen)
+
+
+def applyNewest(results: Iterable, seen: PmidSet) -> Iterator:
+    """ Helper method that keeps the latest version of every article.
+        Parameters:
+            - results       Iterable, parseBulkFile results, newest file first.
+            - seen          PmidSet, PMIDs returned or deleted by newer files.
+        Returns:
+            - articles      Iterator, article objects.
+    """
+
+    for articles, deleted in results:
+        for pmid, article in articles:
+            if pmid in seen:
+                continue
+            seen.add(pmid)
+            yield article
+
+        # A deletion only applies to the files before the update file
+        for pmid in deleted:
+            seen.add(pmid)
+
+
+def parseBulkFile(
+    path: str,
+    keep_xml: bool = False,
+    fields: Optional[Iterable[str]] = None,
+    lazy: bool = False,
+) -> tuple:
+    """ Helper method that parses a baseline or update file.
+        Parameters:
+            - path          Str, location of the (gzip compressed) XML file.
+            - keep_xml      Bool, keep the XML element on PubMedArticle objects.
+            - fields        Iterable, the fields to extract (None: all).
+            - lazy          Bool, extract the fields on first access.
+        Returns:
+            - articles      List, (PMID, article object) tuples, a PMID that
+                            occurs twice in the file keeps its last version.
+            - deleted       List, PMIDs of the DeleteCitation entries.
+    """
+
+    articles = {}
+    deleted = []
+
+    for element in iterArticleElements(iterFileChunks(path), BULK_ELEMENTS):
+        if element.tag == "DeleteCitation":
+            deleted += [int(pmid.text) for pmid in element.iter("PMID")]
+            continue
+
+        pmid = elementPmid(element)
+        article = articleFromElement(element, fields=fields, lazy=lazy)
+        if not keep_xml and not lazy and isinstance(article, PubMedArticle):
+            article.xml = None
+        articles[int(pmid)] = article
+
+    return list(articles.items()), deleted
+
+
+def iterFileChunks(path: str) -> Iterator:
+    """ Helper method that reads a (gzip compressed) file in chunks.
+        Parameters:
+            - path          Str, location of the file.
+        Returns:
+            - chunks        Iterator, bytes of the decompressed file.
+    """
+
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as bulk_file:
+        while True:
+            chunk = bulk_file.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
@@ -0,0 +1,399 @@
+import collections
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Callable, Iterable, Optional
+
+
+class ArticleCache(object):
+    """ Persistent SQLite store of the raw efetch XML of articles, keyed by PMID.
+        Entries are compressed, expire after a freshness TTL and the least
+        recently used entries are evicted once the store exceeds its size.
+    """
+
+    def __init__(
+        self: object,
+        path: str,
+        max_size: int = 512 * 1024 * 1024,
+        ttl: Optional[float] = 7 * 24 * 60 * 60,
+    ) -> None:
+        """ Initialization of the cache.
+            Parameters:
+                - path          Str, location of the SQLite database file.
+                - max_size      Int, maximum size of the stored (compressed) XML
+                                in bytes.
+                - ttl           Float, seconds an entry stays fresh (None: entries
+                                never expire).
+        """
+
+        self.path = path
+        self.max_size = max_size
+        self.ttl = ttl
+
+        # The connection is shared by the download threads, guarded by the lock
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS articles ("
+                "pmid TEXT PRIMARY KEY, xml BLOB, size INTEGER, stored REAL, accessed REAL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS articles_accessed ON articles (accessed)"
+            )
+
+    def __enter__(self: object) -> object:
+        return self
+
+    def __exit__(self: object, *exc_info) -> None:
+        self.close()
+
+    def __len__(self: object) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def close(self: object) -> None:
+        """ Close the database connection.
+        """
+
+        with self._lock:
+            self._connection.close()
+
+    def get(self: object, pmids: Iterable[str]) -> dict:
+        """ Look up the XML of several articles.
+            Parameters:
+                - pmids         Iterable, PMIDs to look up.
+            Returns:
+                - articles      Dict, XML bytes per PMID of the fresh entries
+                                (misses and expired entries are left out).
+        """
+
+        pmids = [str(pmid) for pmid in pmids]
+        now = time.time()
+        oldest = now - self.ttl if self.ttl is not None else float("-inf")
+        articles = {}
+
+        with self._lock:
+
+            # SQLite limits the number of variables per statement
+            for index in range(0, len(pmids), 500):
+                chunk = pmids[index : index + 500]
+                rows = self._connection.execute(
+                    "SELECT pmid, xml FROM articles WHERE stored >= ? AND pmid IN (%s)"
+                    % ",".join("?" * len(chunk)),
+                    [oldest, *chunk],
+                )
+                for pmid, data in rows:
+                    articles[pmid] = zlib.decompress(data)
+
+            # Mark the hits as recently used
+            with self._connection:
+                self._connection.executemany(
+                    "UPDATE articles SET accessed = ? WHERE pmid = ?",
+                    [(now, pmid) for pmid in articles],
+                )
+
+        return articles
+
+    def put(self: object, articles: Iterable[tuple]) -> None:
+        """ Store the XML of several articles and evict entries if the cache
+            became too large.
+            Parameters:
+                - articles      Iterable, (PMID, XML bytes) tuples.
+        """
+
+        now = time.time()
+        rows = []
+        for pmid, data in articles:
+            data = zlib.compress(data)
+            rows.append((str(pmid), data, len(data), now, now))
+        if not rows:
+            return
+
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO articles (pmid, xml, size, stored, accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._evict()
+
+    def _evict(self: object) -> None:
+        """ Helper method that removes expired entries and then the least
+            recently used ones until the cache fits into max_size. Must be
+            called with the lock held.
+        """
+
+        # Expired entries would be downloaded again anyway
+        if self.ttl is not None:
+            self._connection.execute(
+                "DELETE FROM articles WHERE stored < ?", (time.time() - self.ttl,)
+            )
+
+        size = self._connection.execute("SELECT TOTAL(size) FROM articles").fetchone()[0]
+        if size <= self.max_size:
+            return
+
+        # Walk the entries from the least recently used one
+        evicted = []
+        cursor = self._connection.execute(
+            "SELECT pmid, size FROM articles ORDER BY accessed"
+        )
+        for pmid, entry_size in cursor:
+            evicted.append((pmid,))
+            size -= entry_size
+            if size <= self.max_size:
+                break
+        cursor.close()
+
+        self._connection.executemany("DELETE FROM articles WHERE pmid = ?", evicted)
+
+
+class SearchCache(object):
+    """ In-memory LRU cache of esearch ID lists with a freshness TTL, optionally
+        persisted to a JSON file. A stored result also answers searches for
+        fewer results (its IDs are a prefix of the larger result).
+    """
+
+    def __init__(
+        self: object,
+        max_entries: int = 128,
+        ttl: Optional[float] = 60 * 60,
+        path: Optional[str] = None,
+    ) -> None:
+        """ Initialization of the cache.
+            Parameters:
+                - max_entries   Int, maximum number of stored searches.
+                - ttl           Float, seconds a result stays fresh (None: results
+                                never expire).
+                - path          Str, JSON file the results are persisted in
+                                (None: memory only).
+        """
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+
+        # Warm the cache with the persisted results
+        if path is not None and os.path.exists(path):
+            with open(path, encoding="utf8") as json_file:
+                for key, entry in json.load(json_file):
+                    if self._isFresh(entry):
+                        self._entries[key] = entry
+
+    def __len__(self: object) -> int:
+        return len(self._entries)
+
+    def get(
+        self: object, query: str, max_results: int, **options
+    ) -> Optional[list]:
+        """ Look up the IDs of a search.
+            Parameters:
+                - query         Str, the search term.
+                - max_results   Int, number of requested IDs (-1: all of them).
+                - options       Further search parameters that change the result.
+            Returns:
+                - article_ids   List, the IDs, None if the search is not cached
+                                with enough results.
+        """
+
+        key = self._key(query, options)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not self._isFresh(entry):
+                return None
+
+            # A result can be reused for any search it fully covers
+            ids, count = entry["ids"], entry["count"]
+            needed = count if max_results == -1 else min(max_results, count)
+            if len(ids) < needed:
+                return None
+
+            self._entries.move_to_end(key)
+            return ids[:needed]
+
+    def put(
+        self: object, query: str, article_ids: list, count: int, **options
+    ) -> None:
+        """ Store the IDs of a search.
+            Parameters:
+                - query         Str, the search term.
+                - article_ids   List, the retrieved IDs in result order.
+                - count         Int, total number of results of the search.
+                - options       Further search parameters that change the result.
+        """
+
+        key = self._key(query, options)
+
+        with self._lock:
+
+            # Don't replace a longer fresh result by a prefix of it
+            entry = self._entries.get(key)
+            if (
+                entry is not None
+                and self._isFresh(entry)
+                and len(entry["ids"]) >= len(article_ids)
+            ):
+                self._entries.move_to_end(key)
+                return
+
+            self._entries[key] = {
+                "ids": list(article_ids),
+                "count": count,
+                "stored": time.time(),
+            }
+            self._entries.move_to_end(key)
+
+            # Evict the least recently used searches
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+            if self.path is not None:
+                self._save()
+
+    def _key(self: object, query: str, options: dict) -> str:
+        """ Helper method that builds the cache key of a search, whitespace in the
+            search term is normalized (case is kept, "AND"/"and" differ in PubMed).
+        """
+
+        return json.dumps([" ".join(query.split()), sorted(options.items())])
+
+    def _isFresh(self: object, entry: dict) -> bool:
+        return self.ttl is None or entry["stored"] >= time.time() - self.ttl
+
+    def _save(self: object) -> None:
+        """ Helper method that writes the cache to its JSON file. Must be called
+            with the lock held.
+        """
+
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf8") as json_file:
+            json.dump(list(self._entries.items()), json_file)
+        os.replace(temporary, self.path)
+
+
+class SyncStore(object):
+    """ JSON file with the state of saved searches that are synced repeatedly,
+        the IDs of every search and the date of its last sync.
+    """
+
+    def __init__(self: object, path: str) -> None:
+        """ Initialization of the store, loads the saved searches.
+            Parameters:
+                - path          Str, location of the JSON file.
+        """
+
+        self.path = path
+
+        self._lock = threading.Lock()
+        self._entries = {}
+
+        if os.path.exists(path):
+            with open(path, encoding="utf8") as json_file:
+                self._entries = json.load(json_file)
+
+    def __contains__(self: object, name: str) -> bool:
+        return name in self._entries
+
+    def get(self: object, name: str) -> Optional[dict]:
+        """ Look up a saved search.
+            Parameters:
+                - name          Str, name of the saved search.
+            Returns:
+                - entry         Dict, "query", "ids" (list) and "synced" (ISO
+                                date of the last sync), None if it isn't saved.
+        """
+
+        with self._lock:
+            return self._entries.get(name)
+
+    def put(self: object, name: str, query: str, article_ids: Iterable, synced: str) -> None:
+        """ Save the state of a search after a sync.
+            Parameters:
+                - name          Str, name of the saved search.
+                - query         Str, the search term.
+                - article_ids   Iterable, the IDs of all results.
+                - synced        Str, ISO date of the sync.
+        """
+
+        with self._lock:
+            self._entries[name] = {
+                "query": query,
+                "ids": sorted(article_ids, key=int),
+                "synced": synced,
+            }
+            self._save()
+
+    def remove(self: object, name: str) -> None:
+        """ Forget a saved search.
+        """
+
+        with self._lock:
+            if self._entries.pop(name, None) is not None:
+                self._save()
+
+    def _save(self: object) -> None:
+        """ Helper method that writes a new file and swaps it in, an interruption
+            keeps the old state. Must be called with the lock held.
+        """
+
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf8") as json_file:
+            json.dump(self._entries, json_file)
+        os.replace(temporary, self.path)
+
+
+class ProcessingCache(object):
+    """ In-memory LRU cache of processed article fields, keyed by PMID, field,
+        processing stage and the settings the stage depends on. Every entry
+        keeps the input it was computed from, a revised article is processed
+        again.
+    """
+
+    def __init__(self: object, max_entries: int = 500000) -> None:
+        """ Initialization of the cache.
+            Parameters:
+                - max_entries   Int, maximum number of stored results.
+        """
+
+        self.max_entries = max_entries
+
+        self._entries = collections.OrderedDict()
+
+    def __len__(self: object) -> int:
+        return len(self._entries)
+
+    def get(self: object, key: tuple, source: object, process: Callable) -> object:
+        """ Look up a processed field, processing it on a miss.
+            Parameters:
+                - key           Tuple, PMID, field, stage and settings.
+                - source        Object, the input of the stage.
+                - process       Callable, computes the result from the input.
+            Returns:
+                - result        Object, the processed field.
+        """
+
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == source:
+            self._entries.move_to_end(key)
+            return entry[1]
+
+        result = process(source)
+        self._entries[key] = (source, result)
+        self._entries.move_to_end(key)
+
+        # Evict the least recently used results
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        return result
+
+    def clear(self: object) -> None:
+        self._entries.clear()
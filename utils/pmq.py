@@ -1,66 +1,329 @@
+import collections
+from concurrent.futures import Executor, FIRST_COMPLETED, ThreadPoolExecutor, wait
 import datetime
+import email.utils
 import itertools
 import json
+import os
+import queue
+import random
+import re
 import requests
-from typing import Optional, TypeVar, Union
+import threading
+import time
+from typing import Callable, Iterable, Iterator, Optional, Tuple, TypeVar, Union
 from xml.etree.ElementTree import Element
 import xml.etree.ElementTree as xml
 
+from .cache import ArticleCache, SearchCache, SyncStore
+
 
 # Base url for all queries
 BASE_URL = "https://eutils.ncbi.nlm.nih.gov"
 
+# Requests per second allowed by NCBI, without and with an API key
+RATE_LIMIT = 3
+RATE_LIMIT_API_KEY = 10
+
+# Default (connect, read) timeouts in seconds
+TIMEOUT = (10, 120)
+
+# Number of bytes handed to the XML parser at once when streaming
+CHUNK_SIZE = 64 * 1024
+
+# Number of articles per efetch request, for ID lists and history server pages
+BATCH_SIZE = 250
+HISTORY_BATCH_SIZE = 1000
+
+# Number of articles per esummary request, and the largest requests (the IDs
+# are posted, history server pages are limited to 10,000 records)
+SUMMARY_BATCH_SIZE = 1000
+ESUMMARY_MAX_IDS = 5000
+ESUMMARY_MAX_RETMAX = 10000
+
+# Number of esearch pages buffered ahead of efetch, and the size of the first
+# page (searches up to this size take one request, efetch starts after it)
+ESEARCH_PREFETCH = 2
+ESEARCH_PAGE = 1000
+
+# esearch doesn't return results past the first 10,000 of a search, larger
+# searches are split into date windows (by publication date, a day that is
+# still too large by Entrez date)
+ESEARCH_MAX_RESULTS = 10000
+PLANNER_DATETYPES = ("pdat", "edat")
+PLANNER_MIN_DATE = datetime.date(1700, 1, 1)
+
+# Top level elements of the articles in efetch and baseline XML
+ARTICLE_ELEMENTS = frozenset(("PubmedArticle", "PubmedBookArticle"))
+
+# Largest efetch batches, the IDs are sent in the URL and history server pages
+# are limited to 10,000 records
+EFETCH_MAX_IDS = 500
+EFETCH_MAX_RETMAX = 10000
+
+# Responses that are worth retrying, and the backoff between the attempts
+RETRY_STATUS = frozenset((429, 500, 502, 503, 504))
+RETRY_BACKOFF = 1
+RETRY_BACKOFF_MAX = 60
+
+class StreamInterrupted(requests.RequestException):
+    """ The body of a streamed response stalled past the read timeout or its
+        connection was reset (iter_content raises a ConnectionError for both).
+        Unlike a ConnectionError of the request itself, which _get already
+        retried, the batch is downloaded again.
+    """
+
+
+# Errors while reading a streamed response, the batch is downloaded again
+STREAM_ERRORS = (
+    StreamInterrupted,
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.ContentDecodingError,
+    xml.ParseError,
+)
+
+# IDs posted to the history server per epost request
+EPOST_MAX_IDS = 10000
+
+# Separators of the PMIDs in ID files
+PMID_SEPARATORS = re.compile(r"[\s,;]+")
+PMID_MAX = 10 ** 9
+
+# Result of a sync, the added, changed and removed PMIDs and the downloaded
+# (added and changed) articles
+SyncResult = collections.namedtuple(
+    "SyncResult", ("added", "changed", "removed", "articles")
+)
+
 class PubMedQuery(object):
     """PubMed API Wrapper
     """
 
-    def __init__(self, email):
+    def __init__(
+        self,
+        email,
+        api_key: Optional[str] = None,
+        timeout: Tuple[float, float] = TIMEOUT,
+        max_connections: int = 10,
+        stream: bool = True,
+        cache: Optional[ArticleCache] = None,
+        search_cache: Optional[SearchCache] = None,
+        max_retries: int = 5,
+        fields: Optional[Iterable[str]] = None,
+        lazy: bool = False,
+        base_url: str = BASE_URL,
+        rate_limit: Optional[float] = None,
+    ):
         """Object Initialization
 
         Args:
             email (str): email of the user of the tool, not required but kindly 
                          requested by PMC (PubMed Central) in case of enquiry.".
+            api_key (str, optional): NCBI API key, raises the rate limit from 3 to
+                                     10 requests per second. Defaults to None.
+            timeout (tuple, optional): (connect, read) timeouts in seconds for
+                                       every request. Defaults to TIMEOUT.
+            max_connections (int, optional): size of the keep-alive connection
+                                             pool. Defaults to 10.
+            stream (bool, optional): parse efetch responses incrementally while
+                                     they are downloaded instead of loading the
+                                     whole document first. Defaults to True.
+            cache (ArticleCache, optional): local store of downloaded articles,
+                                            only cache misses are requested from
+                                            PubMed. Defaults to None.
+            search_cache (SearchCache, optional): memo of the IDs of previous
+                                                  searches. Defaults to None.
+            max_retries (int, optional): retries of a request after a connection
+                                         error, 429 or 5xx response, with jittered
+                                         exponential backoff. Defaults to 5.
+            fields (iterable, optional): article fields to extract, the others are
+                                         None and the XML element is only kept if
+                                         "xml" is listed. Defaults to None (all).
+            lazy (bool, optional): keep every article as serialized XML and extract
+                                   its fields on first access. Defaults to False.
+            base_url (str, optional): address of the E-utilities, e.g. a local
+                                      mock server. Defaults to BASE_URL.
+            rate_limit (float, optional): requests per second. Defaults to None
+                                          (the NCBI limit of the credentials).
         """
 
         # Parameters
         self.tool = "IntoPubMed - Jupyter Notebook for graphic content analysis (currently in development)"
         self.email = email
+        self.api_key = api_key
         self.db = "pubmed"
 
-        self._rateLimit = 1
-        self._requestsMade = []
+        # The rate limit depends on the credentials
+        self._rateLimit = RATE_LIMIT_API_KEY if api_key else RATE_LIMIT
+        if rate_limit is not None:
+            self._rateLimit = rate_limit
+        self._rateLimiter = TokenBucket(rate=self._rateLimit)
 
         # Define the standard / default query parameters
         self.parameters = {"tool": self.tool, "email": self.email, "db": self.db}
+        if api_key:
+            self.parameters["api_key"] = api_key
+
+        self.base_url = base_url
+        self.timeout = timeout
+        self.stream = stream
+        self.cache = cache
+        self.search_cache = search_cache
+        self.max_retries = max_retries
+        self.fields = frozenset(fields) if fields is not None else None
+        self.lazy = lazy
+
+        # Batches of the last call that still failed after all retries (with
+        # skip_failed)
+        self.failed_batches = []
+
+        # Date windows of the search of the last call that still exceeded the
+        # esearch limit on a single day, only their first 10,000 results are
+        # returned
+        self.truncated_windows = []
+
+        # Transfer of the batch being downloaded, tallied per download thread
+        self._transfer = TransferMeter()
+
+        # Pooled session, keeps the connections alive between requests
+        self._session = requests.Session()
+        self._session.headers.update({"Accept-Encoding": "gzip, deflate"})
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=max_connections
+        )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    def __enter__(self: object) -> object:
+        return self
+
+    def __exit__(self: object, *exc_info) -> None:
+        self.close()
+
+    def close(self: object) -> None:
+        """ Close the pooled connections of the session.
+        """
+
+        self._session.close()
+
+    def _resetFailures(self: object) -> None:
+        """ Helper method that starts the failures of a new call, they only
+            report the call that is made now.
+        """
+
+        self.failed_batches = []
+        self.truncated_windows = []
     
-    def query(self: object, query: str, max_results: int = 100):
+    def query(
+        self: object,
+        query: str,
+        max_results: int = 100,
+        workers: int = 1,
+        ordered: bool = True,
+        use_history: bool = False,
+        skip_failed: bool = False,
+        checkpoint: Optional[str] = None,
+        batch_size: Union[int, "AdaptiveBatcher", None] = None,
+        summary: bool = False,
+    ):
         """Method that executes a query agains the GraphQL schema, automatically
            inserting the PubMed data loader.
 
         Args:
             query (str): String, the GraphQL query to execute against the schema.
             max_results (int, optional): max. Number of returned entries. Defaults to 100.
+            workers (int, optional): number of batches downloaded concurrently,
+                                     all workers share the rate limit. Defaults to 1.
+            ordered (bool, optional): return the articles in the order of the IDs,
+                                      otherwise batches are returned as they complete
+                                      (only used with workers > 1). Defaults to True.
+            use_history (bool, optional): keep the search result on the E-utilities
+                                          history server and page efetch through it
+                                          (WebEnv/query_key) instead of sending the
+                                          IDs back. Defaults to False.
+            skip_failed (bool, optional): continue with the next batch when a batch
+                                          still fails after all retries, failed
+                                          batches are collected in failed_batches.
+                                          Defaults to False.
+            checkpoint (str, optional): JSON lines file recording the completed batches,
+                                        an interrupted download started again with
+                                        the same file resumes after them (the
+                                        caller has to keep the articles returned
+                                        before). Defaults to None.
+            batch_size (int, AdaptiveBatcher, optional): fixed number of articles
+                                        per efetch request, or the batcher adapting
+                                        it. Defaults to None (an AdaptiveBatcher
+                                        aiming at the default targets).
+            summary (bool, optional): only download the metadata (journal, dates,
+                                      author names, ...) through esummary, text
+                                      fields like the abstract are None. Defaults
+                                      to False.
 
         Returns:
             [type]: ExecutionResult, GraphQL object that contains the result
                     in the "data" attribute.
         """
 
-        # Retrieve the article IDs for the query
-        article_ids = self._getArticleIds(query=query, max_results=max_results)
+        self._resetFailures()
+        checkpoint = Checkpoint(checkpoint, query) if checkpoint else None
+
+        # Let the history server hold the IDs and fetch the result in pages
+        if use_history:
+            webenv, query_key, count = self._searchHistory(query=query)
+            if max_results != -1:
+                count = min(count, max_results)
+
+            # Only page through the positions that are not completed yet
+            ranges = [(0, count)]
+            if checkpoint is not None:
+                ranges = checkpoint.remainingRanges(count)
+
+            if summary:
+                fetch = self._getSummariesFromHistory
+                batch_size = self._batchSize(
+                    batch_size, SUMMARY_BATCH_SIZE, ESUMMARY_MAX_RETMAX
+                )
+            else:
+                fetch = self._getArticlesFromHistory
+                batch_size = self._batchSize(
+                    batch_size, HISTORY_BATCH_SIZE, EFETCH_MAX_RETMAX
+                )
+            return self._fetchBatches(
+                historyBatches(webenv, query_key, ranges, batch_size),
+                fetch=fetch,
+                workers=workers,
+                ordered=ordered,
+                skip_failed=skip_failed,
+                checkpoint=checkpoint,
+                batch_size=batch_size,
+            )
 
-        # Get the articles themselves
-        articles = list(
-            [
-                self._getArticles(article_ids=batch)
-                for batch in batches(article_ids, 250)
-            ]
+        # Stream the article IDs for the query, efetch starts on the first page
+        article_ids = self._streamArticleIds(
+            query=query, max_results=max_results, workers=workers
         )
 
-        # Chain the batches back together and return the list
-        return itertools.chain.from_iterable(articles)
+        # Get the articles themselves
+        return self._fetchArticleIds(
+            article_ids,
+            workers=workers,
+            ordered=ordered,
+            skip_failed=skip_failed,
+            checkpoint=checkpoint,
+            batch_size=batch_size,
+            summary=summary,
+        )
     
-    def query_ids(self: object, id_string: str,):
+    def query_ids(
+        self: object,
+        id_string: str,
+        workers: int = 1,
+        ordered: bool = True,
+        skip_failed: bool = False,
+        checkpoint: Optional[str] = None,
+        batch_size: Union[int, "AdaptiveBatcher", None] = None,
+        summary: bool = False,
+    ):
         # ToDo Change Comments
     
         """Method that executes a query agains the GraphQL schema, automatically
@@ -69,43 +332,513 @@ class PubMedQuery(object):
         Args:
             query (str): String, the GraphQL query to execute against the schema.
             max_results (int, optional): max. Number of returned entries. Defaults to 100.
+            workers (int, optional): number of batches downloaded concurrently,
+                                     all workers share the rate limit. Defaults to 1.
+            ordered (bool, optional): return the articles in the order of the IDs,
+                                      otherwise batches are returned as they complete
+                                      (only used with workers > 1). Defaults to True.
+            skip_failed (bool, optional): continue with the next batch when a batch
+                                          still fails after all retries, failed
+                                          batches are collected in failed_batches.
+                                          Defaults to False.
+            checkpoint (str, optional): JSON lines file recording the completed batches,
+                                        an interrupted download started again with
+                                        the same file resumes after them. Defaults
+                                        to None.
+            batch_size (int, AdaptiveBatcher, optional): fixed number of articles
+                                        per efetch request, or the batcher adapting
+                                        it. Defaults to None (an AdaptiveBatcher
+                                        aiming at the default targets).
+            summary (bool, optional): only download the metadata (journal, dates,
+                                      author names, ...) through esummary, text
+                                      fields like the abstract are None. Defaults
+                                      to False.
 
         Returns:
             [type]: ExecutionResult, GraphQL object that contains the result
                     in the "data" attribute.
         """
 
+        self._resetFailures()
+
         # Retrieve the article IDs for the query
         article_ids = id_string.replace(' ', '').replace('\n', '').split(',')
 
         # Get the articles themselves
+        return self._fetchArticleIds(
+            article_ids,
+            workers=workers,
+            ordered=ordered,
+            skip_failed=skip_failed,
+            checkpoint=Checkpoint(checkpoint) if checkpoint else None,
+            batch_size=batch_size,
+            summary=summary,
+        )
+
+    def query_id_file(
+        self: object,
+        source: Union[str, Iterable],
+        workers: int = 1,
+        ordered: bool = True,
+        skip_failed: bool = False,
+        batch_size: Union[int, "AdaptiveBatcher", None] = None,
+        summary: bool = False,
+    ) -> Iterator:
+        """Method that downloads the articles of a long list of PMIDs. The IDs
+           are read as a stream, posted to the history server in chunks (epost)
+           and the articles fetched through it, so the list never has to fit
+           into memory or a URL.
+
+        Args:
+            source (str, iterable): text file with PMIDs separated by commas,
+                                    whitespace or new lines, or an iterable of
+                                    PMIDs (or such lines). Duplicates are left
+                                    out, anything else than a PMID raises a
+                                    ValueError.
+            workers (int, optional): number of batches downloaded concurrently.
+                                     Defaults to 1.
+            ordered (bool, optional): return the articles in the order of the IDs,
+                                      otherwise batches are returned as they complete
+                                      (only used with workers > 1). Defaults to True.
+            skip_failed (bool, optional): continue with the next batch when a batch
+                                          still fails after all retries, failed
+                                          batches are collected in failed_batches.
+                                          Defaults to False.
+            batch_size (int, AdaptiveBatcher, optional): fixed number of articles
+                                        per efetch request, or the batcher adapting
+                                        it. Defaults to None (adaptive).
+            summary (bool, optional): only download the esummary metadata.
+                                      Defaults to False.
+
+        Returns:
+            Iterator: the article objects.
+        """
+
+        self._resetFailures()
+
+        if summary:
+            fetch = self._getSummariesFromHistory
+            batch_size = self._batchSize(batch_size, SUMMARY_BATCH_SIZE, ESUMMARY_MAX_RETMAX)
+        else:
+            fetch = self._getArticlesFromHistory
+            batch_size = self._batchSize(batch_size, HISTORY_BATCH_SIZE, EFETCH_MAX_RETMAX)
+
+        # The next chunk is posted while the current one downloads
+        def pages() -> Iterator:
+            posted = prefetch(self._postIds(iterPmids(source)), maxsize=1)
+            for webenv, query_key, count in posted:
+                yield from historyBatches(webenv, query_key, [(0, count)], batch_size)
+
+        return self._fetchBatches(
+            pages(),
+            fetch=fetch,
+            workers=workers,
+            ordered=ordered,
+            skip_failed=skip_failed,
+            batch_size=batch_size,
+        )
+
+    def query_table(self: object, query: str, **kwargs) -> "ArticleTable":
+        """Method that executes a query and returns the articles as a columnar
+           table instead of one object per article.
+
+        Args:
+            query (str): String, the query to execute against the PubMed database.
+            kwargs: further arguments of query (max_results, workers, ...).
+
+        Returns:
+            ArticleTable: the articles, rows behave like the article objects.
+        """
+
+        from .table import ArticleTable
+
+        return ArticleTable.fromArticles(self.query(query, **kwargs))
+
+    def query_many(
+        self: object,
+        queries: Iterable[str],
+        max_results: int = 100,
+        workers: int = 1,
+        skip_failed: bool = False,
+        batch_size: Union[int, "AdaptiveBatcher", None] = None,
+        summary: bool = False,
+    ) -> dict:
+        """Method that executes several queries at once. The searches run
+           concurrently and an article found by several of them is downloaded
+           once, the results share the article objects.
+
+        Args:
+            queries (iterable): Strings, the queries to execute against the PubMed
+                                database.
+            max_results (int, optional): max. Number of returned entries per query.
+                                         Defaults to 100.
+            workers (int, optional): number of batches downloaded concurrently.
+                                     Defaults to 1.
+            skip_failed (bool, optional): continue with the next batch when a batch
+                                          still fails after all retries, the
+                                          articles of failed batches are missing
+                                          from the results. Defaults to False.
+            batch_size (int, AdaptiveBatcher, optional): fixed number of articles
+                                        per efetch request, or the batcher adapting
+                                        it. Defaults to None (adaptive).
+            summary (bool, optional): only download the esummary metadata.
+                                      Defaults to False.
+
+        Returns:
+            dict: list of articles per query, in the order of the search results.
+        """
+
+        self._resetFailures()
+        queries = list(dict.fromkeys(queries))
+
+        # The searches only wait for the rate limit, run as many as it allows
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(len(queries), int(self._rateLimit)))
+        ) as executor:
+            results = list(
+                executor.map(
+                    lambda query: self._getArticleIds(
+                        query=query, max_results=max_results
+                    ),
+                    queries,
+                )
+            )
+
+        # Download the union of the results, every article once
+        article_ids = list(dict.fromkeys(itertools.chain.from_iterable(results)))
+        articles = {}
+        for article in self._fetchArticleIds(
+            article_ids,
+            workers=workers,
+            ordered=False,
+            skip_failed=skip_failed,
+            checkpoint=None,
+            batch_size=batch_size,
+            summary=summary,
+        ):
+            articles[article._pmid] = article
+
+        return {
+            query: [articles[pmid] for pmid in ids if pmid in articles]
+            for query, ids in zip(queries, results)
+        }
+
+    def sync(
+        self: object,
+        name: str,
+        query: str,
+        store: SyncStore,
+        workers: int = 1,
+        summary: bool = False,
+    ) -> SyncResult:
+        """Method that brings a saved search up to date, only the articles that
+           are new or were revised since the last sync are downloaded.
+
+        Args:
+            name (str): name of the saved search in the store.
+            query (str): String, the query to execute against the PubMed database
+                         (a saved search can't change its query).
+            store (SyncStore): holds the IDs and the date of the last sync, the
+                               new state is saved after the download.
+            workers (int, optional): number of batches downloaded concurrently.
+                                     Defaults to 1.
+            summary (bool, optional): only download the esummary metadata.
+                                      Defaults to False.
+
+        Returns:
+            SyncResult: added, changed and removed PMIDs (sorted lists) and the
+                        downloaded articles (all results on the first sync).
+        """
+
+        self._resetFailures()
+
+        entry = store.get(name)
+        if entry is not None and entry["query"] != query:
+            raise ValueError(
+                f"Saved search {name!r} belongs to the query {entry['query']!r}"
+            )
+
+        # Taken before searching, a record revised during the sync is found again
+        synced = datetime.date.today()
+
+        # The difference to the saved IDs are the added and removed articles
+        article_ids, _ = self._esearchArticleIds(
+            query=query, max_results=-1, workers=workers
+        )
+        current = set(article_ids)
+        previous = set(entry["ids"]) if entry is not None else set()
+
+        # Articles revised since the last sync (NCBI dates are US Eastern days,
+        # the day before the last sync is searched again)
+        changed = set()
+        if entry is not None:
+            since = datetime.date.fromisoformat(entry["synced"]) - datetime.timedelta(
+                days=1
+            )
+            modified_ids, _ = self._esearchArticleIds(
+                query=f'({query}) AND ("{since:%Y/%m/%d}"[mdat] : "3000"[mdat])',
+                max_results=-1,
+                workers=workers,
+            )
+            changed = set(modified_ids) & previous & current
+
+        added = sorted(current - previous, key=int)
+        changed = sorted(changed, key=int)
+        removed = sorted(previous - current, key=int)
+
         articles = list(
-            [
-                self._getArticles(article_ids=batch)
-                for batch in batches(article_ids, 250)
-            ]
+            self._fetchArticleIds(
+                added + changed,
+                workers=workers,
+                ordered=True,
+                skip_failed=False,
+                checkpoint=None,
+                batch_size=None,
+                summary=summary,
+            )
         )
 
-        # Chain the batches back together and return the list
-        return itertools.chain.from_iterable(articles)
+        # Only advance the saved state once the articles are downloaded
+        store.put(name, query, current, synced.isoformat())
 
+        return SyncResult(added, changed, removed, articles)
 
-    def _exceededRateLimit(self) -> bool:
-        # ToDo: own Docstring 
-        """ Helper method to check if we've exceeded the rate limit.
+    def _fetchArticleIds(
+        self: object,
+        article_ids: Iterable,
+        workers: int,
+        ordered: bool,
+        skip_failed: bool,
+        checkpoint: Optional["Checkpoint"],
+        batch_size: Union[int, "AdaptiveBatcher", None],
+        summary: bool = False,
+    ) -> Iterator:
+        """ Helper method that downloads a list of article IDs in batches.
+            Parameters:
+                - article_ids   Iterable, article IDs (a list, or an iterator
+                                that is consumed while the batches download).
+                - checkpoint    Checkpoint, IDs completed earlier are left out.
+                - batch_size    Int / AdaptiveBatcher, size of the batches (None:
+                                adaptive).
+                - summary       Bool, download the esummary metadata only.
+            Returns:
+                - articles      Iterator, article objects.
+        """
+
+        # Only download the articles that are not completed yet
+        if checkpoint is not None:
+            article_ids = checkpoint.remainingIds(article_ids)
+
+        if summary:
+            fetch = self._getSummaries
+            batch_size = self._batchSize(batch_size, SUMMARY_BATCH_SIZE, ESUMMARY_MAX_IDS)
+        else:
+            fetch = self._getArticles
+            batch_size = self._batchSize(batch_size, BATCH_SIZE, EFETCH_MAX_IDS)
+        return self._fetchBatches(
+            batches(article_ids, batch_size),
+            fetch=fetch,
+            workers=workers,
+            ordered=ordered,
+            skip_failed=skip_failed,
+            checkpoint=checkpoint,
+            batch_size=batch_size,
+        )
+
+    def _batchSize(
+        self: object,
+        batch_size: Union[int, "AdaptiveBatcher", None],
+        size: int,
+        max_size: int,
+    ) -> Union[int, "AdaptiveBatcher"]:
+        """ Helper method that creates the default AdaptiveBatcher when no batch
+            size is given.
+            Parameters:
+                - batch_size    Int / AdaptiveBatcher / None, requested size.
+                - size          Int, size of the first batch.
+                - max_size      Int, NCBI limit of the request.
+        """
+
+        if batch_size is None:
+            return AdaptiveBatcher(size=size, max_size=max_size)
+        return batch_size
+
+    def _fetchBatches(
+        self: object,
+        id_batches: Iterable,
+        fetch: Optional[Callable] = None,
+        workers: int = 1,
+        ordered: bool = True,
+        skip_failed: bool = False,
+        checkpoint: Optional["Checkpoint"] = None,
+        batch_size: Union[int, "AdaptiveBatcher"] = BATCH_SIZE,
+    ) -> Iterator:
+        """ Helper method that downloads batches of article IDs, sequentially or
+            on a thread pool.
+            Parameters:
+                - id_batches    Iterable, batches of article IDs.
+                - fetch         Callable, downloads one batch and returns its
+                                articles (defaults to _getArticles).
+                - workers       Int, number of batches downloaded concurrently.
+                - ordered       Bool, keep the order of the batches, otherwise
+                                yield the batches as they complete.
+                - skip_failed   Bool, record failed batches and continue.
+                - checkpoint    Checkpoint, records the completed batches.
+                - batch_size    Int / AdaptiveBatcher, the batcher creating the
+                                batches is told about every transfer.
+            Returns:
+                - articles      Iterator, article objects.
+        """
+
+        if fetch is None:
+            fetch = self._getArticles
+
+        batcher = batch_size if isinstance(batch_size, AdaptiveBatcher) else None
+
+        # Sequential download, every batch is fetched when it is reached
+        if workers <= 1:
+            return self._fetchBatchesSequentially(
+                id_batches=id_batches,
+                fetch=fetch,
+                skip_failed=skip_failed,
+                checkpoint=checkpoint,
+                batcher=batcher,
+            )
+
+        return self._fetchBatchesConcurrently(
+            id_batches=id_batches,
+            fetch=fetch,
+            workers=workers,
+            ordered=ordered,
+            skip_failed=skip_failed,
+            checkpoint=checkpoint,
+            batcher=batcher,
+        )
+
+    def _fetchBatchesSequentially(
+        self: object,
+        id_batches: Iterable,
+        fetch: Callable,
+        skip_failed: bool,
+        checkpoint: Optional["Checkpoint"],
+        batcher: Optional["AdaptiveBatcher"],
+    ) -> Iterator:
+        """ Helper method that downloads and parses one batch after the other.
+        """
+
+        for batch in id_batches:
+            complete = yield from self._fetchBatch(fetch, batch, skip_failed, batcher)
+            if complete and checkpoint is not None:
+                checkpoint.complete(batch)
+
+    def _fetchBatchesConcurrently(
+        self: object,
+        id_batches: Iterable,
+        fetch: Callable,
+        workers: int,
+        ordered: bool,
+        skip_failed: bool,
+        checkpoint: Optional["Checkpoint"],
+        batcher: Optional["AdaptiveBatcher"],
+    ) -> Iterator:
+        """ Helper method that downloads and parses batches on a thread pool.
+            Every worker takes its tokens from the shared rate limiter, so the
+            pool never exceeds the allowed number of requests per second.
+        """
+
+        def fetchList(batch):
+            articles = []
+            iterator = self._fetchBatch(fetch, batch, skip_failed, batcher)
+            while True:
+                try:
+                    articles.append(next(iterator))
+                except StopIteration as stop:
+                    return batch, articles, stop.value
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for batch, articles, complete in imapBounded(
+                fetchList, id_batches, executor, inflight=2 * workers, ordered=ordered
+            ):
+                yield from articles
+                if complete and checkpoint is not None:
+                    checkpoint.complete(batch)
+
+    def _fetchBatch(
+        self: object,
+        fetch: Callable,
+        batch: object,
+        skip_failed: bool,
+        batcher: Optional["AdaptiveBatcher"] = None,
+    ) -> Iterator:
+        """ Helper method that downloads one batch. A response that breaks off
+            or stalls while it is streamed is requested again, articles that were already
+            returned are skipped (recognized by their IDs rather than their
+            position, a retry can return cached articles that were skipped).
+            Parameters:
+                - fetch         Callable, downloads the batch.
+                - batch         Object, the batch (IDs or history server page).
+                - skip_failed   Bool, record a failed batch instead of raising.
+                - batcher       AdaptiveBatcher, adapted to the transfer of the
+                                batch.
             Returns:
-                - exceeded      Bool, Whether or not the rate limit is exceeded.
+                - articles      Iterator, article objects, the generator returns
+                                whether the batch was downloaded completely.
         """
 
-        # Remove requests from the list that are longer than 1 second ago
-        self._requestsMade = [requestTime for requestTime in self._requestsMade if requestTime > datetime.datetime.now() - datetime.timedelta(seconds=1)]
+        self._transfer.reset()
+        returned = set()
+        disrupted = False
+        for attempt in itertools.count():
+            try:
+                for article in fetch(batch):
+                    if article._pmid not in returned:
+                        returned.add(article._pmid)
+                        yield article
+
+                # Size the next batches after this one, shrink after timeouts
+                # and responses that broke off
+                if batcher is not None:
+                    transfer = self._transfer
+                    if transfer.timeouts or disrupted:
+                        batcher.backOff()
+                    else:
+                        batcher.record(transfer.articles, transfer.seconds, transfer.bytes)
+                return True
+
+            except STREAM_ERRORS:
+                disrupted = True
+                if attempt < self.max_retries:
+                    time.sleep(backoffDelay(attempt))
+
+                    # The timeouts of the batch are kept across its attempts
+                    timeouts = self._transfer.timeouts
+                    self._transfer.reset()
+                    self._transfer.timeouts = timeouts
+                    continue
+                if batcher is not None:
+                    batcher.backOff()
+                if not skip_failed:
+                    raise
+
+            except requests.RequestException:
+                if batcher is not None:
+                    batcher.backOff()
+                if not skip_failed:
+                    raise
+
+            # Isolate the failure, the remaining batches are still downloaded
+            self.failed_batches.append(batch)
+            return False
 
-        # Return whether we've made more requests in the last second, than the rate limit
-        return len(self._requestsMade) > self._rateLimit
 
     def _get(
-        self: object, url: str, parameters: dict, output: str = "json"
-    ) -> Union[dict, str]:
+        self: object,
+        url: str,
+        parameters: dict,
+        output: str = "json",
+        stream: bool = False,
+        post: bool = False,
+    ) -> Union[dict, str, requests.Response]:
         # ToDo: own Docstring 
         """ Generic helper method that makes a request to PubMed.
             Parameters:
@@ -114,128 +847,1133 @@ class PubMedQuery(object):
                 - parameters    Dict, parameters to use for the request
                 - output        Str, type of output that is requested (defaults to
                                 JSON but can be used to retrieve XML)
+                - stream        Bool, return the response before its body is
+                                downloaded, the caller has to close it
+                - post          Bool, send the parameters in the body of a POST
+                                request (long ID lists don't fit into the URL)
             Returns:
                 - response      Dict / str, if the response is valid JSON it will
                                 be parsed before returning, otherwise a string is
-                                returend
+                                returend (the Response object when streaming)
         """
 
-        # Make sure the rate limit is not exceeded
-        while self._exceededRateLimit():
-            pass
-
         # Set the response mode
         parameters["retmode"] = output
+        request = {"data": parameters} if post else {"params": parameters}
+
+        for attempt in itertools.count():
+
+            # Make sure the rate limit is not exceeded (blocks until a request is allowed)
+            self._rateLimiter.acquire()
+
+            # Make the request to PubMed, retry on connection problems
+            started = time.monotonic()
+            try:
+                response = self._session.request(
+                    "POST" if post else "GET",
+                    f"{self.base_url}{url}",
+                    timeout=self.timeout,
+                    stream=stream,
+                    **request,
+                )
+            except (
+                requests.ConnectionError,
+                requests.Timeout,
+                requests.exceptions.ChunkedEncodingError,
+            ) as error:
+                if isinstance(error, requests.Timeout):
+                    self._transfer.timeouts += 1
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(backoffDelay(attempt))
+                continue
+
+            if response.ok:
+                self._transfer.seconds += time.monotonic() - started
+                break
+            response.close()
+
+            # Retry on rate limiting and server errors, honoring Retry-After
+            if response.status_code in RETRY_STATUS and attempt < self.max_retries:
+                delay = retryAfter(response)
+                time.sleep(delay if delay is not None else backoffDelay(attempt))
+                continue
+
+            # Check for any errors
+            response.raise_for_status()
+
+        # Return the response
+        if stream:
+            return response
+        elif output == "json":
+            return response.json()
+        else:
+            return response.text
+    
+    def _getArticles(self: object, article_ids: list) -> list:
+        """ Helper method that batches a list of article IDs and retrieves the content.
+            Parameters:
+                - article_ids   List, article IDs.
+            Returns:
+                - articles      List, article objects.
+        """
+
+        if self.cache is not None:
+            return self._getArticlesCached(article_ids=article_ids)
+
+        # Get the default parameters
+        parameters = self.parameters.copy()
+        parameters["id"] = article_ids
+
+        return self._efetch(parameters=parameters)
+
+    def _getArticlesCached(self: object, article_ids: list) -> Iterator:
+        """ Helper method that takes the articles from the cache and only downloads
+            the missing ones, which are stored in the cache afterwards. The
+            cached articles are merged into the downloaded ones, so the articles
+            keep the order of the IDs.
+            Parameters:
+                - article_ids   List, article IDs.
+            Returns:
+                - articles      Iterator, article objects.
+        """
+
+        # Articles that are already stored locally
+        article_ids = [str(pmid) for pmid in article_ids]
+        cached = self.cache.get(article_ids)
+        hits = [pmid for pmid in article_ids if pmid in cached]
+        missing = [pmid for pmid in article_ids if pmid not in cached]
+
+        # Position of every ID, the hits are returned before the first
+        # downloaded article that comes after them
+        position = {pmid: index for index, pmid in enumerate(article_ids)}
+        next_hit = 0
+
+        def cachedArticle(pmid: str) -> object:
+            return articleFromSource(cached[pmid], pmid=pmid, fields=self.fields, lazy=self.lazy)
+
+        # Get the default parameters
+        parameters = self.parameters.copy()
+        parameters["id"] = missing
+
+        # Keep the raw XML of every downloaded article for the cache
+        downloaded = []
+        try:
+            for element in self._efetchElements(parameters=parameters) if missing else ():
+                pmid, data = elementPmid(element), xml.tostring(element)
+                downloaded.append((pmid, data))
+
+                # The cached articles that come before this one
+                until = position.get(pmid, len(position))
+                while next_hit < len(hits) and position[hits[next_hit]] < until:
+                    yield cachedArticle(hits[next_hit])
+                    next_hit += 1
+
+                # A lazy article keeps the serialized element that is cached
+                if self.lazy:
+                    yield articleFromSource(data, pmid=pmid, fields=self.fields, lazy=True)
+                else:
+                    yield articleFromElement(element, fields=self.fields)
+        finally:
+            self.cache.put(downloaded)
+
+        for pmid in hits[next_hit:]:
+            yield cachedArticle(pmid)
+
+    def _getArticlesFromHistory(self: object, batch: tuple) -> Iterator:
+        """ Helper method that retrieves one page of a search result stored on
+            the history server.
+            Parameters:
+                - batch         Tuple, (WebEnv, query_key, retstart, retmax).
+            Returns:
+                - articles      Iterator, article objects.
+        """
+
+        webenv, query_key, retstart, retmax = batch
+
+        # Get the default parameters
+        parameters = self.parameters.copy()
+        parameters["WebEnv"] = webenv
+        parameters["query_key"] = query_key
+        parameters["retstart"] = retstart
+        parameters["retmax"] = retmax
+
+        return self._efetch(parameters=parameters)
+
+    def _efetch(self: object, parameters: dict) -> Iterator:
+        """ Helper method that makes an efetch request and parses the articles.
+            Parameters:
+                - parameters    Dict, parameters selecting the articles (IDs or
+                                a history server page).
+            Returns:
+                - articles      Iterator, article objects.
+        """
+
+        for element in self._efetchElements(parameters=parameters):
+            yield articleFromElement(element, fields=self.fields, lazy=self.lazy)
+
+    def _efetchElements(self: object, parameters: dict) -> Iterator:
+        """ Helper method that makes an efetch request and yields the XML
+            elements of the articles.
+            Parameters:
+                - parameters    Dict, parameters selecting the articles (IDs or
+                                a history server page).
+            Returns:
+                - elements      Iterator, PubmedArticle / PubmedBookArticle elements.
+        """
+
+        # Feed the response into the parser while it is downloaded
+        if self.stream:
+            response = self._get(
+                url="/entrez/eutils/efetch.fcgi",
+                parameters=parameters,
+                output="xml",
+                stream=True,
+            )
+            try:
+                chunks = self._meterChunks(response.iter_content(chunk_size=CHUNK_SIZE))
+                for element in iterArticleElements(chunks):
+                    self._transfer.articles += 1
+                    yield element
+            finally:
+                response.close()
+            return
+
+        # Make the request
+        response = self._get(
+            url="/entrez/eutils/efetch.fcgi", parameters=parameters, output="xml"
+        )
+        self._transfer.bytes += len(response)
+
+        # Parse as XML
+        root = xml.fromstring(response)
+
+        # Loop over the articles, journal articles first
+        for element in itertools.chain(
+            root.iter("PubmedArticle"), root.iter("PubmedBookArticle")
+        ):
+            self._transfer.articles += 1
+            yield element
+
+    def _meterChunks(self: object, chunks: Iterable) -> Iterator:
+        """ Helper method that adds the size of a streamed response and the time
+            spent waiting for it to the transfer of the current batch (parsing
+            between the chunks is not counted). A body that stalls or breaks
+            off raises StreamInterrupted and counts as a timeout.
+            Parameters:
+                - chunks        Iterable, bytes of the response.
+            Returns:
+                - chunks        Iterator, the same bytes.
+        """
+
+        transfer = self._transfer
+        chunks = iter(chunks)
+        while True:
+            started = time.monotonic()
+            try:
+                chunk = next(chunks, None)
+            except (requests.ConnectionError, requests.Timeout) as error:
+                transfer.timeouts += 1
+                raise StreamInterrupted(error) from error
+            transfer.seconds += time.monotonic() - started
+            if chunk is None:
+                return
+            transfer.bytes += len(chunk)
+            yield chunk
+
+    def _getSummaries(self: object, article_ids: list) -> Iterator:
+        """ Helper method that retrieves the esummary metadata of article IDs.
+            Parameters:
+                - article_ids   List, article IDs.
+            Returns:
+                - articles      Iterator, article objects without text fields.
+        """
+
+        # Get the default parameters, the IDs are posted
+        parameters = self.parameters.copy()
+        parameters["id"] = ",".join(article_ids)
+
+        return self._esummary(parameters=parameters, post=True)
+
+    def _getSummariesFromHistory(self: object, batch: tuple) -> Iterator:
+        """ Helper method that retrieves the esummary metadata of one page of a
+            search result stored on the history server.
+            Parameters:
+                - batch         Tuple, (WebEnv, query_key, retstart, retmax).
+            Returns:
+                - articles      Iterator, article objects without text fields.
+        """
+
+        webenv, query_key, retstart, retmax = batch
+
+        # Get the default parameters
+        parameters = self.parameters.copy()
+        parameters["WebEnv"] = webenv
+        parameters["query_key"] = query_key
+        parameters["retstart"] = retstart
+        parameters["retmax"] = retmax
+
+        return self._esummary(parameters=parameters)
+
+    def _esummary(self: object, parameters: dict, post: bool = False) -> Iterator:
+        """ Helper method that makes an esummary request and converts the records.
+            Parameters:
+                - parameters    Dict, parameters selecting the articles (IDs or
+                                a history server page).
+                - post          Bool, post the parameters.
+            Returns:
+                - articles      Iterator, article objects without text fields.
+        """
+
+        response = self._get(
+            url="/entrez/eutils/esummary.fcgi", parameters=parameters, post=post
+        )
+        result = response.get("result", {})
+
+        for uid in result.get("uids", []):
+            self._transfer.articles += 1
+            yield articleFromSummary(result[uid])
+
+    def _searchHistory(self: object, query: str) -> tuple:
+        """ Helper method that runs a search and stores its result on the history
+            server instead of returning the IDs.
+            Parameters:
+                - query         Str, query to be executed against the PubMed database.
+            Returns:
+                - history       Tuple, (WebEnv, query_key, number of results).
+        """
+
+        # Get the default parameters
+        parameters = self.parameters.copy()
+
+        # Only the history entry and the number of results are needed
+        parameters["term"] = query
+        parameters["usehistory"] = "y"
+        parameters["retmax"] = 0
+
+        response = self._get(url="/entrez/eutils/esearch.fcgi", parameters=parameters)
+        result = response.get("esearchresult", {})
+
+        return result.get("webenv"), result.get("querykey"), int(result.get("count"))
+
+    def _postIds(self: object, article_ids: Iterable) -> Iterator:
+        """ Helper method that posts article IDs to the history server in chunks,
+            all chunks share one WebEnv.
+            Parameters:
+                - article_ids   Iterable, article IDs.
+            Returns:
+                - history       Iterator, (WebEnv, query_key, number of articles)
+                                tuple per chunk.
+        """
+
+        webenv = None
+        for chunk in batches(article_ids, EPOST_MAX_IDS):
+            webenv, query_key, count = self._epost(chunk, webenv)
+            if count:
+                yield webenv, query_key, count
+
+    def _epost(self: object, article_ids: list, webenv: Optional[str] = None) -> tuple:
+        """ Helper method that stores a list of article IDs on the history server.
+            Parameters:
+                - article_ids   List, article IDs.
+                - webenv        Str, WebEnv to add the IDs to (None: a new one).
+            Returns:
+                - history       Tuple, (WebEnv, query_key, number of articles),
+                                IDs unknown to PubMed are not counted.
+        """
+
+        # Get the default parameters
+        parameters = self.parameters.copy()
+        parameters["id"] = ",".join(article_ids)
+        if webenv is not None:
+            parameters["WebEnv"] = webenv
+
+        # epost only answers in XML
+        response = xml.fromstring(
+            self._get(
+                url="/entrez/eutils/epost.fcgi",
+                parameters=parameters,
+                output="xml",
+                post=True,
+            )
+        )
+
+        error = response.findtext("ERROR")
+        if error:
+            raise ValueError(f"epost failed: {error}")
+
+        invalid = len(response.findall("InvalidIdList/Id"))
+        return (
+            response.findtext("WebEnv"),
+            response.findtext("QueryKey"),
+            len(article_ids) - invalid,
+        )
+
+    def _getArticleIds(self: object, query: str, max_results: int) -> list:
+        # ToDo: own Docstring 
+        """ Helper method to retrieve the article IDs for a query.
+            Parameters:
+                - query         Str, query to be executed against the PubMed database.
+                - max_results   Int, the maximum number of results to retrieve.
+            Returns:
+                - article_ids   List, article IDs as a list.
+        """
+
+        # Reuse the IDs of an earlier search
+        if self.search_cache is not None:
+            article_ids = self.search_cache.get(query, max_results, db=self.db)
+            if article_ids is not None:
+                return article_ids
+
+        article_ids, total_result_count = self._esearchArticleIds(
+            query=query, max_results=max_results
+        )
+
+        if self.search_cache is not None:
+            self.search_cache.put(query, article_ids, total_result_count, db=self.db)
+
+        return article_ids
+
+    def _esearchArticleIds(
+        self: object, query: str, max_results: int, workers: int = 1
+    ) -> tuple:
+        """ Helper method that pages through esearch to retrieve the article IDs.
+            Parameters:
+                - query         Str, query to be executed against the PubMed database.
+                - max_results   Int, the maximum number of results to retrieve.
+                - workers       Int, number of date windows searched concurrently
+                                (searches above the esearch limit).
+            Returns:
+                - article_ids   List, article IDs as a list.
+                - count         Int, total number of results of the query.
+        """
+
+        # Create a placeholder for the retrieved IDs
+        article_ids = []
+        total_result_count = 0
+
+        for page, total_result_count in self._iterArticleIdPages(
+            query=query, max_results=max_results, workers=workers
+        ):
+            article_ids += page
+
+        # Return the response
+        return article_ids, total_result_count
+
+    def _streamArticleIds(
+        self: object, query: str, max_results: int, workers: int = 1
+    ) -> Iterator:
+        """ Helper method that yields the article IDs of a query while esearch is
+            still paging. The pages are requested on a background thread and
+            handed over through a bounded queue, so efetch starts after the
+            first page.
+            Parameters:
+                - query         Str, query to be executed against the PubMed database.
+                - max_results   Int, the maximum number of results to retrieve.
+                - workers       Int, number of date windows searched concurrently.
+            Returns:
+                - article_ids   Iterator, article IDs.
+        """
+
+        # Reuse the IDs of an earlier search
+        if self.search_cache is not None:
+            article_ids = self.search_cache.get(query, max_results, db=self.db)
+            if article_ids is not None:
+                yield from article_ids
+                return
+
+        # The complete ID list is only kept for the search cache
+        article_ids = [] if self.search_cache is not None else None
+        total_result_count = 0
+
+        pages = self._iterArticleIdPages(
+            query=query, max_results=max_results, first_page=ESEARCH_PAGE, workers=workers
+        )
+        for page, total_result_count in prefetch(pages, maxsize=ESEARCH_PREFETCH):
+            if article_ids is not None:
+                article_ids += page
+            yield from page
+
+        if article_ids is not None:
+            self.search_cache.put(query, article_ids, total_result_count, db=self.db)
+
+    def _iterArticleIdPages(
+        self: object,
+        query: str,
+        max_results: int,
+        first_page: Optional[int] = None,
+        workers: int = 1,
+        window: Optional[dict] = None,
+    ) -> Iterator:
+        """ Helper method that pages through esearch and yields every page of
+            article IDs as soon as it is received. A search with more results
+            than esearch returns is split into date windows.
+            Parameters:
+                - query         Str, query to be executed against the PubMed database.
+                - max_results   Int, the maximum number of results to retrieve.
+                - first_page    Int, size of the first page (a small first page
+                                returns the first IDs sooner).
+                - workers       Int, number of date windows searched concurrently.
+                - window        Dict, datetype, mindate and maxdate of a date
+                                window (it is not split any further).
+            Returns:
+                - pages         Iterator, (article IDs, total number of results)
+                                tuples.
+        """
+
+        # Get the default parameters
+        parameters = self.parameters.copy()
+        if window is not None:
+            parameters.update(window)
+
+        # Add specific query parameters
+        parameters["term"] = query
+        parameters["retmax"] = ESEARCH_MAX_RESULTS
+
+        # Calculate a cut off point based on the max_results parameter
+        if max_results != -1 and max_results < parameters["retmax"]:
+            parameters["retmax"] = max_results
+        page_size = parameters["retmax"]
+        if first_page is not None:
+            parameters["retmax"] = min(first_page, page_size)
+
+        # Make the first request to PubMed
+        response = self._get(url="/entrez/eutils/esearch.fcgi", parameters=parameters)
+
+        # Get information from the response
+        total_result_count = int(response.get("esearchresult", {}).get("count"))
+        retrieved_count = int(response.get("esearchresult", {}).get("retmax"))
+        page = response.get("esearchresult", {}).get("idlist", [])
+
+        # Hand over the retrieved IDs
+        yield page, total_result_count
+
+        # If no max is provided (-1) we'll try to retrieve everything
+        if max_results == -1:
+            max_results = total_result_count
+        parameters["retmax"] = page_size
+
+        # Results past the esearch limit are searched in date windows
+        if window is None and min(max_results, total_result_count) > ESEARCH_MAX_RESULTS:
+            yield from self._iterWindowPages(
+                query, total_result_count, max_results, set(page), workers
+            )
+            return
+        max_results = min(max_results, ESEARCH_MAX_RESULTS)
+
+        # If not all articles are retrieved, continue to make requests untill we have everything
+        while retrieved_count < total_result_count and retrieved_count < max_results:
+
+            # Calculate a cut off point based on the max_results parameter
+            if (max_results - retrieved_count) < parameters["retmax"]:
+                parameters["retmax"] = max_results - retrieved_count
+
+            # Start the collection from the number of already retrieved articles
+            parameters["retstart"] = retrieved_count
+
+            # Make a new request
+            response = self._get(
+                url="/entrez/eutils/esearch.fcgi", parameters=parameters
+            )
+
+            # Get information from the response
+            page = response.get("esearchresult", {}).get("idlist", [])
+            retrieved_count += int(response.get("esearchresult", {}).get("retmax"))
+
+            # Stop if the server returns no more IDs, instead of looping forever
+            if not page:
+                break
+            yield page, total_result_count
+
+    def _iterWindowPages(
+        self: object,
+        query: str,
+        count: int,
+        max_results: int,
+        seen: set,
+        workers: int,
+    ) -> Iterator:
+        """ Helper method that retrieves the IDs of a search above the esearch
+            limit window by window, the windows are searched concurrently and
+            the IDs merged without duplicates.
+            Parameters:
+                - query         Str, query to be executed against the PubMed database.
+                - count         Int, total number of results of the query.
+                - max_results   Int, the maximum number of results to retrieve.
+                - seen          Set, IDs that were already returned.
+                - workers       Int, number of windows searched concurrently.
+            Returns:
+                - pages         Iterator, (article IDs, total number of results)
+                                tuples.
+        """
+
+        retrieved_count = len(seen)
+
+        def search(window: tuple) -> list:
+            term, parameters, _ = window
+            article_ids = []
+            for page, _ in self._iterArticleIdPages(
+                term, ESEARCH_MAX_RESULTS, window=parameters
+            ):
+                article_ids += page
+            return article_ids
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            windows = self._planWindows(query, count, executor)
+
+            # The newest windows first, like the default sort order of esearch
+            for page in imapBounded(search, windows, executor, inflight=max(1, workers)):
+                page = [pmid for pmid in page if pmid not in seen]
+                page = page[: max_results - retrieved_count]
+                seen.update(page)
+                retrieved_count += len(page)
+                if page:
+                    yield page, count
+                if retrieved_count >= max_results:
+                    return
+
+    def _planWindows(self: object, query: str, count: int, executor: Executor) -> list:
+        """ Helper method that splits a search into date windows with at most
+            ESEARCH_MAX_RESULTS results each. Windows are split by publication
+            date, proportionally to their number of results, a single day that
+            is still too large is split by the next date type.
+            Parameters:
+                - query         Str, query to be executed against the PubMed database.
+                - count         Int, total number of results of the query.
+                - executor      Executor, runs the count requests of a level
+                                concurrently.
+            Returns:
+                - windows       List, (term, esearch parameters, count) tuples,
+                                the newest window first.
+        """
+
+        first = PLANNER_MIN_DATE
+        last = datetime.date(datetime.date.today().year + 2, 12, 31)
+
+        windows = []
+        pending = [(query, 0, first, last, count)]
+        while pending:
+            splits = []
+            for term, datetype, start, end, window_count in pending:
+                days = (end - start).days + 1
+
+                # Small enough, or the next date type splits the day
+                if window_count <= ESEARCH_MAX_RESULTS:
+                    windows.append((term, datetype, start, end, window_count))
+                elif days > 1:
+                    parts = min(days, -(-window_count * 2 // ESEARCH_MAX_RESULTS))
+                    for part in range(parts):
+                        splits.append(
+                            (
+                                term,
+                                datetype,
+                                start + datetime.timedelta(days=days * part // parts),
+                                start
+                                + datetime.timedelta(days=days * (part + 1) // parts - 1),
+                            )
+                        )
+                elif datetype + 1 < len(PLANNER_DATETYPES):
+                    day = start.strftime("%Y/%m/%d")
+                    splits.append(
+                        (
+                            f'({term}) AND ("{day}"[{PLANNER_DATETYPES[datetype]}])',
+                            datetype + 1,
+                            first,
+                            last,
+                        )
+                    )
+                else:
+                    windows.append((term, datetype, start, end, window_count))
+                    self.truncated_windows.append(
+                        (term, self._windowParameters(datetype, start, end))
+                    )
+
+            # Count the results of the new windows
+            counts = executor.map(lambda split: self._searchCount(*split), splits)
+            pending = [split + (split_count,) for split, split_count in zip(splits, counts)]
+
+        # Merge adjoining small windows to save requests (a day that was split
+        # by the next date type is missing, the windows around it don't adjoin)
+        windows.sort(key=lambda window: (window[0], window[1], window[2]))
+        merged = []
+        for window in windows:
+            previous = merged[-1] if merged else None
+            if (
+                previous is not None
+                and previous[:2] == window[:2]
+                and previous[3] + datetime.timedelta(days=1) == window[2]
+                and previous[4] + window[4] <= ESEARCH_MAX_RESULTS
+            ):
+                merged[-1] = (*previous[:3], window[3], previous[4] + window[4])
+            else:
+                merged.append(window)
+
+        # Empty windows are dropped
+        merged.sort(key=lambda window: window[3], reverse=True)
+        return [
+            (term, self._windowParameters(datetype, start, end), window_count)
+            for term, datetype, start, end, window_count in merged
+            if window_count
+        ]
+
+    def _searchCount(
+        self: object, query: str, datetype: int, start: datetime.date, end: datetime.date
+    ) -> int:
+        """ Helper method that returns the number of results of a date window.
+        """
+
+        parameters = self.parameters.copy()
+        parameters.update(self._windowParameters(datetype, start, end))
+        parameters["term"] = query
+        parameters["retmax"] = 0
+
+        response = self._get(url="/entrez/eutils/esearch.fcgi", parameters=parameters)
+        return int(response.get("esearchresult", {}).get("count"))
+
+    def _windowParameters(
+        self: object, datetype: int, start: datetime.date, end: datetime.date
+    ) -> dict:
+        """ Helper method that returns the esearch parameters of a date window.
+        """
+
+        return {
+            "datetype": PLANNER_DATETYPES[datetype],
+            "mindate": start.strftime("%Y/%m/%d"),
+            "maxdate": end.strftime("%Y/%m/%d"),
+        }
+
+
+# -------------------------------------------------------------
+# ratelimit.py
+# -------------------------------------------------------------
+
+class TokenBucket(object):
+    """ Thread-safe token bucket that limits how often requests are made.
+        Callers that find the bucket empty sleep until their token is due
+        instead of polling.
+    """
+
+    def __init__(self: object, rate: float, capacity: float = 1) -> None:
+        """ Initialization of the bucket.
+            Parameters:
+                - rate          Float, tokens added per second.
+                - capacity      Float, maximum number of tokens that can be saved
+                                up for a burst (1 spaces requests evenly).
+        """
+
+        self.rate = rate
+        self.capacity = capacity
+
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self: object) -> None:
+        """ Take one token from the bucket, sleeping until it is available.
+        """
+
+        with self._lock:
+
+            # Refill the bucket for the time passed since the last call
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+
+            # Reserve a token, the balance may go negative to queue up callers
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+
+        # Sleep outside of the lock so other threads can reserve their token
+        if wait > 0:
+            time.sleep(wait)
+
+
+# -------------------------------------------------------------
+# batching.py
+# -------------------------------------------------------------
+
+class AdaptiveBatcher(object):
+    """ Thread-safe efetch batch size that follows the observed transfers. The
+        size grows or shrinks (at most by a factor of 2 per batch) so a batch
+        takes about target_seconds and target_bytes, and halves after a failed
+        batch.
+    """
+
+    def __init__(
+        self: object,
+        size: int = 250,
+        min_size: int = 10,
+        max_size: int = EFETCH_MAX_IDS,
+        target_seconds: float = 10,
+        target_bytes: int = 16 * 1024 * 1024,
+        smoothing: float = 0.5,
+    ) -> None:
+        """ Initialization of the batcher.
+            Parameters:
+                - size          Int, size of the first batch.
+                - min_size      Int, smallest batch size.
+                - max_size      Int, largest batch size (NCBI limit of the request).
+                - target_seconds Float, aimed transfer time of a batch.
+                - target_bytes  Int, aimed response size of a batch.
+                - smoothing     Float, weight of the newest batch in the averaged
+                                time and size per article.
+        """
+
+        self.min_size = min_size
+        self.max_size = max_size
+        self.target_seconds = target_seconds
+        self.target_bytes = target_bytes
+        self.smoothing = smoothing
+        self.size = min(max(size, min_size), max_size)
+
+        # Averaged seconds and bytes per article (None before the first batch)
+        self._seconds = None
+        self._bytes = None
+        self._lock = threading.Lock()
+
+    def record(self: object, articles: int, seconds: float, nbytes: int) -> None:
+        """ Adapt the batch size to a completed transfer.
+            Parameters:
+                - articles      Int, number of downloaded articles.
+                - seconds       Float, time spent on the request and the response.
+                - nbytes        Int, size of the response.
+        """
+
+        if articles <= 0:
+            return
+
+        with self._lock:
+            self._seconds = self._average(self._seconds, seconds / articles)
+            self._bytes = self._average(self._bytes, nbytes / articles)
+
+            # Size that meets both targets at the current rates
+            ideal = float("inf")
+            if self._seconds > 0:
+                ideal = min(ideal, self.target_seconds / self._seconds)
+            if self._bytes > 0:
+                ideal = min(ideal, self.target_bytes / self._bytes)
+
+            # Change gradually, a single outlier must not swing the size
+            lower = max(self.min_size, self.size // 2)
+            upper = min(self.max_size, self.size * 2)
+            self.size = int(min(max(ideal, lower), upper))
+
+    def backOff(self: object) -> None:
+        """ Halve the batch size after a failed or interrupted batch.
+        """
+
+        with self._lock:
+            self.size = max(self.min_size, self.size // 2)
+
+    def _average(self: object, average: Optional[float], value: float) -> float:
+        if average is None:
+            return value
+        return self.smoothing * value + (1 - self.smoothing) * average
+
+
+class TransferMeter(threading.local):
+    """ Per-thread tally of the efetch transfer of the batch being downloaded,
+        read by the AdaptiveBatcher.
+    """
+
+    def __init__(self: object) -> None:
+        self.reset()
+
+    def reset(self: object) -> None:
+        self.articles = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.timeouts = 0
+
+
+def batchSize(n: Union[int, AdaptiveBatcher]) -> int:
+    """ Helper method that returns the current size of a fixed or adaptive batch.
+    """
+
+    if isinstance(n, AdaptiveBatcher):
+        return n.size
+    return n
+
+
+def batchLength(batch: object) -> int:
+    """ Helper method that returns the number of articles requested by a batch.
+        Parameters:
+            - batch         List of IDs, or (WebEnv, query_key, retstart, retmax).
+        Returns:
+            - length        Int, number of articles.
+    """
+
+    if isinstance(batch, tuple):
+        return batch[3]
+    return len(batch)
+
+
+# -------------------------------------------------------------
+# checkpoint.py
+# -------------------------------------------------------------
+
+class Checkpoint(object):
+    """ JSON lines file that records which articles of a download are complete,
+        so an interrupted download can resume where it stopped. The first line
+        names the query, every completed batch appends a line: ID batches are
+        recorded by their IDs, history server pages by their position (a
+        search result that changed in the meantime can shift these pages).
+        Neither depends on the batch sizes, which can differ between runs.
+    """
+
+    def __init__(self: object, path: str, query: Optional[str] = None) -> None:
+        """ Initialization of the checkpoint, loads the articles completed earlier.
+            Parameters:
+                - path          Str, location of the JSON lines file.
+                - query         Str, search the download belongs to, a checkpoint
+                                of another search is rejected.
+        """
 
-        # Make the request to PubMed
-        response = requests.get(f"{BASE_URL}{url}", params=parameters)
+        self.path = path
+        self.query = query
 
-        # Check for any errors
-        response.raise_for_status()
+        self._lock = threading.Lock()
+        self._ids = set()
+        self._ranges = []
 
-        # Add this request to the list of requests made
-        self._requestsMade.append(datetime.datetime.now())
+        if os.path.exists(path):
+            self._load()
 
-        # Return the response
-        if output == "json":
-            return response.json()
-        else:
-            return response.text
-    
-    def _getArticles(self: object, article_ids: list) -> list:
-        """ Helper method that batches a list of article IDs and retrieves the content.
-            Parameters:
-                - article_ids   List, article IDs.
-            Returns:
-                - articles      List, article objects.
+    def _load(self: object) -> None:
+        """ Helper method that merges the lines of the file (a checkpoint of
+            an earlier version is a single JSON object with the same keys). A
+            line that was cut off by an interruption is removed, so the next
+            line starts cleanly.
         """
 
-        # Get the default parameters
-        parameters = self.parameters.copy()
-        parameters["id"] = article_ids
+        path = self.path
+        with open(path, encoding="utf8") as json_file:
+            lines = json_file.read().split("\n")
+
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                break
+        if lines[len(records):] != [""]:
+            with open(path, "w", encoding="utf8") as json_file:
+                json_file.writelines(json.dumps(record) + "\n" for record in records)
+
+        # A file without any line was interrupted before its first batch
+        if not records:
+            os.remove(path)
+            return
+        if records[0].get("query") != self.query:
+            raise ValueError(
+                f"Checkpoint {path} belongs to the query {records[0].get('query')!r}"
+            )
 
-        # Make the request
-        response = self._get(
-            url="/entrez/eutils/efetch.fcgi", parameters=parameters, output="xml"
-        )
+        for record in records:
+            self._ids.update(record.get("ids", []))
+            for completed in record.get("ranges", []):
+                self._ranges = mergeRanges(self._ranges, tuple(completed))
 
-        # Parse as XML
-        root = xml.fromstring(response)
+    def remainingIds(self: object, article_ids: Iterable) -> Iterable:
+        """ The article IDs that were not completed before (a list for a list,
+            otherwise an iterator).
+        """
 
-        # Loop over the articles and construct article objects
-        for article in root.iter("PubmedArticle"):
-            yield PubMedArticle(xml_element=article)
-        for book in root.iter("PubmedBookArticle"):
-            yield PubMedBookArticle(xml_element=book)
+        if isinstance(article_ids, list):
+            return [pmid for pmid in article_ids if pmid not in self._ids]
+        return (pmid for pmid in article_ids if pmid not in self._ids)
 
-    def _getArticleIds(self: object, query: str, max_results: int) -> list:
-        # ToDo: own Docstring 
-        """ Helper method to retrieve the article IDs for a query.
+    def remainingRanges(self: object, count: int) -> list:
+        """ The positions of a history server result that were not completed before.
             Parameters:
-                - query         Str, query to be executed against the PubMed database.
-                - max_results   Int, the maximum number of results to retrieve.
+                - count         Int, number of results of the download.
             Returns:
-                - article_ids   List, article IDs as a list.
+                - ranges        List, (start, end) tuples of the missing positions.
         """
 
-        # Create a placeholder for the retrieved IDs
-        article_ids = []
+        ranges = []
+        position = 0
+        for start, end in self._ranges:
+            if start >= count:
+                break
+            if start > position:
+                ranges.append((position, start))
+            position = max(position, end)
+        if position < count:
+            ranges.append((position, count))
+        return ranges
+
+    def complete(self: object, batch: object) -> None:
+        """ Record a completed batch, only the batch itself is appended to the
+            file.
+        """
 
-        # Get the default parameters
-        parameters = self.parameters.copy()
+        with self._lock:
+            if isinstance(batch, tuple):
+                completed = (batch[2], batch[2] + batch[3])
+                self._ranges = mergeRanges(self._ranges, completed)
+                record = {"ranges": [completed]}
+            else:
+                self._ids.update(batch)
+                record = {"ids": list(batch)}
 
-        # Add specific query parameters
-        parameters["term"] = query
-        parameters["retmax"] = 50000
+            lines = [json.dumps(record) + "\n"]
+            if not os.path.exists(self.path):
+                lines.insert(0, json.dumps({"query": self.query}) + "\n")
+            with open(self.path, "a", encoding="utf8") as json_file:
+                json_file.writelines(lines)
 
-        # Calculate a cut off point based on the max_results parameter
-        if max_results < parameters["retmax"]:
-            parameters["retmax"] = max_results
 
-        # Make the first request to PubMed
-        response = self._get(url="/entrez/eutils/esearch.fcgi", parameters=parameters)
+def mergeRanges(ranges: list, added: tuple) -> list:
+    """ Helper method that adds a range to a sorted list of disjoint ranges.
+        Parameters:
+            - ranges        List, sorted (start, end) tuples.
+            - added         Tuple, (start, end) of the new range.
+        Returns:
+            - ranges        List, sorted (start, end) tuples, touching and
+                            overlapping ranges are merged.
+    """
 
-        # Add the retrieved IDs to the list
-        article_ids += response.get("esearchresult", {}).get("idlist", [])
+    merged = []
+    for start, end in sorted([*ranges, added]):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
 
-        # Get information from the response
-        total_result_count = int(response.get("esearchresult", {}).get("count"))
-        retrieved_count = int(response.get("esearchresult", {}).get("retmax"))
 
-        # If no max is provided (-1) we'll try to retrieve everything
-        if max_results == -1:
-            max_results = total_result_count
+# -------------------------------------------------------------
+# article.py
+# -------------------------------------------------------------
 
-        # If not all articles are retrieved, continue to make requests untill we have everything
-        while retrieved_count < total_result_count and retrieved_count < max_results:
+# Tags handled by the single pass over an article
+ARTICLE_TAGS = frozenset(
+    (
+        "AbstractText",
+        "ArticleId",
+        "ArticleTitle",
+        "Author",
+        "CopyrightInformation",
+        "Journal",
+        "Keyword",
+        "PubMedPubDate",
+    )
+)
+
+# Tags read for every field, a projection only handles the tags of its fields
+ARTICLE_FIELD_TAGS = {
+    "pubmed_id": ("ArticleId",),
+    "title": ("ArticleTitle",),
+    "abstract": ("AbstractText",),
+    "keywords": ("Keyword",),
+    "journal": ("Journal",),
+    "publication_date": ("PubMedPubDate",),
+    "authors": ("Author",),
+    "methods": ("AbstractText",),
+    "conclusions": ("AbstractText",),
+    "results": ("AbstractText",),
+    "copyrights": ("CopyrightInformation",),
+    "doi": ("ArticleId",),
+}
+
+# Author dict keys per tag, "AffiliationInfo" holds the "affiliation"
+ARTICLE_AUTHOR_FIELDS = {
+    "LastName": "lastname",
+    "ForeName": "firstname",
+    "Initials": "initials",
+    "Affiliation": "affiliation",
+}
+
+class LazyArticle(object):
+    """ Base class of the articles that can keep their XML serialized and
+        extract the fields on first access (lazy mode), and that can be
+        limited to a projection of their fields.
+    """
 
-            # Calculate a cut off point based on the max_results parameter
-            if (max_results - retrieved_count) < parameters["retmax"]:
-                parameters["retmax"] = max_results - retrieved_count
+    __slots__ = ("_source", "_fields", "_pmid")
 
-            # Start the collection from the number of already retrieved articles
-            parameters["retstart"] = retrieved_count
+    def _initialize(
+        self: object,
+        xml_element: Optional[TypeVar("Element")],
+        source: Optional[bytes],
+        fields: Optional[Iterable[str]],
+        lazy: bool,
+        pmid: Optional[str],
+    ) -> None:
+        """ Helper method that initializes the article from XML, now or on the
+            first access of a field.
+            Parameters:
+                - xml_element   Element, the article element.
+                - source        Bytes, the serialized element (instead of
+                                xml_element).
+                - fields        Iterable, the fields to extract (None: all).
+                - lazy          Bool, keep the serialized XML and extract the
+                                fields on first access.
+                - pmid          Str, PMID of the article (read from the element
+                                if it is not given).
+        """
 
-            # Make a new request
-            response = self._get(
-                url="/entrez/eutils/esearch.fcgi", parameters=parameters
-            )
+        self._fields = frozenset(fields) if fields is not None else None
 
-            # Add the retrieved IDs to the list
-            article_ids += response.get("esearchresult", {}).get("idlist", [])
+        if xml_element is None and not lazy:
+            xml_element = xml.fromstring(source)
+        if pmid is None and xml_element is not None:
+            pmid = elementPmid(xml_element)
+        self._pmid = pmid
 
-            # Get information from the response
-            retrieved_count += int(response.get("esearchresult", {}).get("retmax"))
+        if lazy:
+            self._source = source if source is not None else xml.tostring(xml_element)
+        else:
+            self._initializeFromXML(xml_element=xml_element, fields=self._fields)
 
-        # Return the response
-        return article_ids
+    def __getstate__(self: object) -> dict:
+        """ The state that is pickled, e.g. to return an article from a worker
+            process. The slots are read without __getattr__, so a lazy article
+            isn't extracted and only carries its serialized XML.
+        """
 
+        state = {}
+        for cls in type(self).__mro__:
+            for name in getattr(cls, "__slots__", ()):
+                try:
+                    state[name] = object.__getattribute__(self, name)
+                except AttributeError:
+                    continue
+
+        if "_source" in state:
+            return {name: state.get(name) for name in LazyArticle.__slots__}
+        return state
+
+    def __setstate__(self: object, state: dict) -> None:
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
+    def __getattr__(self: object, name: str) -> object:
+        """ Extract the fields of a lazy article on first access (only called
+            for fields that are not set yet).
+        """
 
-# -------------------------------------------------------------
-# article.py
-# -------------------------------------------------------------
+        if name.startswith("_") or name not in self.__slots__:
+            raise AttributeError(name)
+        try:
+            source = self._source
+        except AttributeError:
+            raise AttributeError(name) from None
+
+        # The element is rebuilt on every access instead of being retained
+        if name == "xml":
+            return xml.fromstring(source)
+
+        self._initializeFromXML(xml_element=xml.fromstring(source), fields=self._fields)
+        if "xml" in self.__slots__:
+            del self.xml
+        return getattr(self, name)
 
-class PubMedArticle(object):
+
+class PubMedArticle(LazyArticle):
     """ Data class that contains a PubMed article.
     """
 
@@ -259,70 +1997,41 @@ class PubMedArticle(object):
         self: object,
         xml_element: Optional[TypeVar("Element")] = None,
         *args: list,
+        source: Optional[bytes] = None,
+        fields: Optional[Iterable[str]] = None,
+        lazy: bool = False,
+        pmid: Optional[str] = None,
         **kwargs: dict,
     ) -> None:
         """ Initialization of the object from XML or from parameters.
+            Parameters:
+                - xml_element   Element, the article element.
+                - source        Bytes, the serialized element (instead of
+                                xml_element).
+                - fields        Iterable, the fields to extract, the others are
+                                None (None: all fields).
+                - lazy          Bool, keep the serialized XML instead of the
+                                element and extract the fields on first access.
+                - pmid          Str, PMID of the article if it is already known.
         """
 
         # If an XML element is provided, use it for initialization
-        if xml_element is not None:
-            self._initializeFromXML(xml_element=xml_element)
+        if xml_element is not None or source is not None:
+            self._initialize(xml_element, source, fields, lazy, pmid)
 
         # If no XML element was provided, try to parse the input parameters
         else:
             for field in self.__slots__:
                 self.__setattr__(field, kwargs.get(field, None))
+            self._pmid = pmid if pmid is not None else kwargs.get("pubmed_id")
 
-    def _extractPubMedId(self: object, xml_element: TypeVar("Element")) -> str:
-        path = ".//ArticleId[@IdType='pubmed']"
-        return getContent(element=xml_element, path=path)
-
-    def _extractTitle(self: object, xml_element: TypeVar("Element")) -> str:
-        path = ".//ArticleTitle"
-        return getContent(element=xml_element, path=path)
-
-    def _extractKeywords(self: object, xml_element: TypeVar("Element")) -> str:
-        path = ".//Keyword"
-        return [
-            keyword.text for keyword in xml_element.findall(path) if keyword is not None
-        ]
-
-    def _extractJournal(self: object, xml_element: TypeVar("Element")) -> str:
-        path = ".//Journal/Title"
-        return getContent(element=xml_element, path=path)
-
-    def _extractAbstract(self: object, xml_element: TypeVar("Element")) -> str:
-        path = ".//AbstractText"
-        return getContent(element=xml_element, path=path)
-
-    def _extractConclusions(self: object, xml_element: TypeVar("Element")) -> str:
-        path = ".//AbstractText[@Label='CONCLUSION']"
-        return getContent(element=xml_element, path=path)
-
-    def _extractMethods(self: object, xml_element: TypeVar("Element")) -> str:
-        path = ".//AbstractText[@Label='METHOD']"
-        return getContent(element=xml_element, path=path)
-
-    def _extractResults(self: object, xml_element: TypeVar("Element")) -> str:
-        path = ".//AbstractText[@Label='RESULTS']"
-        return getContent(element=xml_element, path=path)
-
-    def _extractCopyrights(self: object, xml_element: TypeVar("Element")) -> str:
-        path = ".//CopyrightInformation"
-        return getContent(element=xml_element, path=path)
-
-    def _extractDoi(self: object, xml_element: TypeVar("Element")) -> str:
-        path = ".//ArticleId[@IdType='doi']"
-        return getContent(element=xml_element, path=path)
-
-    def _extractPublicationDate(
-        self: object, xml_element: TypeVar("Element")
+    def _parsePublicationDate(
+        self: object, publication_date: Optional[TypeVar("Element")]
     ) -> TypeVar("datetime.datetime"):
         # Get the publication date
         try:
 
             # Get the publication elements
-            publication_date = xml_element.find(".//PubMedPubDate[@PubStatus='pubmed']")
             publication_year = int(getContent(publication_date, ".//Year", None))
             publication_month = int(getContent(publication_date, ".//Month", "1"))
             publication_day = int(getContent(publication_date, ".//Day", "1"))
@@ -337,41 +2046,88 @@ class PubMedArticle(object):
             print(e)
             return None
 
-    def _extractAuthors(self: object, xml_element: TypeVar("Element")) -> list:
-        return [
-            {
-                "lastname": getContent(author, ".//LastName", None),
-                "firstname": getContent(author, ".//ForeName", None),
-                "initials": getContent(author, ".//Initials", None),
-                "affiliation": getContent(author, ".//AffiliationInfo/Affiliation", None),
-            }
-            for author in xml_element.findall(".//Author")
-        ]
+    def _initializeFromXML(
+        self: object, xml_element: TypeVar("Element"), fields: Optional[frozenset] = None
+    ) -> None:
+        """ Helper method that parses an XML element into an article object,
+            walking the element tree once and dispatching on the tag. Fields
+            outside of the projection are None.
+        """
 
-    def _initializeFromXML(self: object, xml_element: TypeVar("Element")) -> None:
-        """ Helper method that parses an XML element into an article object.
-        """
-
-        # Parse the different fields of the article
-        self.pubmed_id = self._extractPubMedId(xml_element)
-        self.title = self._extractTitle(xml_element)
-        self.keywords = self._extractKeywords(xml_element)
-        self.journal = self._extractJournal(xml_element)
-        self.abstract = self._extractAbstract(xml_element)
-        self.conclusions = self._extractConclusions(xml_element)
-        self.methods = self._extractMethods(xml_element)
-        self.results = self._extractResults(xml_element)
-        self.copyrights = self._extractCopyrights(xml_element)
-        self.doi = self._extractDoi(xml_element)
-        self.publication_date = self._extractPublicationDate(xml_element)
-        self.authors = self._extractAuthors(xml_element)
+        # Text of every matching element per field (None: no element found)
+        pubmed_ids, dois, titles, journals, copyrights = None, None, None, None, None
+        abstracts, conclusions, methods, results = None, None, None, None
+        keywords = []
+        authors = []
+        publication_date = None
+
+        tags = projectionTags(ARTICLE_TAGS, ARTICLE_FIELD_TAGS, fields)
+        for element in xml_element.iter():
+            tag = element.tag
+            if tag not in tags:
+                continue
+
+            if tag == "AbstractText":
+                text = element.text
+                abstracts = appendText(abstracts, text)
+                label = element.get("Label")
+                if label == "CONCLUSION":
+                    conclusions = appendText(conclusions, text)
+                elif label == "METHOD":
+                    methods = appendText(methods, text)
+                elif label == "RESULTS":
+                    results = appendText(results, text)
+            elif tag == "Author":
+                authors.append(
+                    extractChildren(element, ARTICLE_AUTHOR_FIELDS, "AffiliationInfo")
+                )
+            elif tag == "ArticleId":
+                id_type = element.get("IdType")
+                if id_type == "pubmed":
+                    pubmed_ids = appendText(pubmed_ids, element.text)
+                elif id_type == "doi":
+                    dois = appendText(dois, element.text)
+            elif tag == "Keyword":
+                keywords.append(element.text)
+            elif tag == "ArticleTitle":
+                titles = appendText(titles, element.text)
+            elif tag == "Journal":
+                for child in element:
+                    if child.tag == "Title":
+                        journals = appendText(journals, child.text)
+            elif tag == "CopyrightInformation":
+                copyrights = appendText(copyrights, element.text)
+            elif tag == "PubMedPubDate":
+                if publication_date is None and element.get("PubStatus") == "pubmed":
+                    publication_date = element
+
+        # Fill the different fields of the article
+        self.pubmed_id = joinText(pubmed_ids)
+        self.title = joinText(titles)
+        self.keywords = keywords
+        self.journal = joinText(journals)
+        self.abstract = joinText(abstracts)
+        self.conclusions = joinText(conclusions)
+        self.methods = joinText(methods)
+        self.results = joinText(results)
+        self.copyrights = joinText(copyrights)
+        self.doi = joinText(dois)
+        self.publication_date = None
+        if publication_date is not None:
+            self.publication_date = self._parsePublicationDate(publication_date)
+        self.authors = authors
         self.xml = xml_element
 
+        if fields is not None:
+            for field in self.__slots__:
+                if field not in fields:
+                    setattr(self, field, None)
+
     def toDict(self: object) -> dict:
         """ Helper method to convert the parsed information to a Python dict.
         """
 
-        return {key: self.__getattribute__(key) for key in self.__slots__}
+        return {key: getattr(self, key) for key in self.__slots__}
 
     def toJSON(self: object) -> str:
         """ Helper method for debugging, dumps the object as JSON string.
@@ -391,7 +2147,53 @@ class PubMedArticle(object):
 # book.py
 # -------------------------------------------------------------
 
-class PubMedBookArticle(object):
+# Tags handled by the single pass over a book article
+BOOK_TAGS = frozenset(
+    (
+        "AbstractText",
+        "ArticleId",
+        "Author",
+        "BookTitle",
+        "CopyrightInformation",
+        "Isbn",
+        "Language",
+        "PubDate",
+        "PublicationType",
+        "Publisher",
+        "Section",
+    )
+)
+
+# Tags read for every field, a projection only handles the tags of its fields
+BOOK_FIELD_TAGS = {
+    "pubmed_id": ("ArticleId",),
+    "title": ("BookTitle",),
+    "abstract": ("AbstractText",),
+    "publication_date": ("PubDate",),
+    "authors": ("Author",),
+    "copyrights": ("CopyrightInformation",),
+    "doi": ("ArticleId",),
+    "isbn": ("Isbn",),
+    "language": ("Language",),
+    "publication_type": ("PublicationType",),
+    "sections": ("Section",),
+    "publisher": ("Publisher",),
+    "publisher_location": ("Publisher",),
+}
+
+# Author and section dict keys per tag
+BOOK_AUTHOR_FIELDS = {
+    "CollectiveName": "collective",
+    "LastName": "lastname",
+    "ForeName": "firstname",
+    "Initials": "initials",
+}
+BOOK_SECTION_FIELDS = {
+    "SectionTitle": "title",
+    "LocationLabel": "chapter",
+}
+
+class PubMedBookArticle(LazyArticle):
     """ Data class that contains a PubMed article.
     """
 
@@ -415,109 +2217,116 @@ class PubMedBookArticle(object):
         self: object,
         xml_element: Optional[TypeVar("Element")] = None,
         *args: list,
+        source: Optional[bytes] = None,
+        fields: Optional[Iterable[str]] = None,
+        lazy: bool = False,
+        pmid: Optional[str] = None,
         **kwargs: dict,
     ) -> None:
         """ Initialization of the object from XML or from parameters.
+            Parameters:
+                - xml_element   Element, the article element.
+                - source        Bytes, the serialized element (instead of
+                                xml_element).
+                - fields        Iterable, the fields to extract, the others are
+                                None (None: all fields).
+                - lazy          Bool, keep the serialized XML instead of the
+                                element and extract the fields on first access.
+                - pmid          Str, PMID of the article if it is already known.
         """
 
         # If an XML element is provided, use it for initialization
-        if xml_element is not None:
-            self._initializeFromXML(xml_element=xml_element)
+        if xml_element is not None or source is not None:
+            self._initialize(xml_element, source, fields, lazy, pmid)
 
         # If no XML element was provided, try to parse the input parameters
         else:
             for field in self.__slots__:
                 self.__setattr__(field, kwargs.get(field, None))
+            self._pmid = pmid if pmid is not None else kwargs.get("pubmed_id")
 
-    def _extractPubMedId(self: object, xml_element: TypeVar("Element")) -> str:
-        path = ".//ArticleId[@IdType='pubmed']"
-        return getContent(element=xml_element, path=path)
-
-    def _extractTitle(self: object, xml_element: TypeVar("Element")) -> str:
-        path = ".//BookTitle"
-        return getContent(element=xml_element, path=path)
-
-    def _extractAbstract(self: object, xml_element: TypeVar("Element")) -> str:
-        path = ".//AbstractText"
-        return getContent(element=xml_element, path=path)
-
-    def _extractCopyrights(self: object, xml_element: TypeVar("Element")) -> str:
-        path = ".//CopyrightInformation"
-        return getContent(element=xml_element, path=path)
-
-    def _extractDoi(self: object, xml_element: TypeVar("Element")) -> str:
-        path = ".//ArticleId[@IdType='doi']"
-        return getContent(element=xml_element, path=path)
-
-    def _extractIsbn(self: object, xml_element: TypeVar("Element")) -> str:
-        path = ".//Isbn"
-        return getContent(element=xml_element, path=path)
-
-    def _extractLanguage(self: object, xml_element: TypeVar("Element")) -> str:
-        path = ".//Language"
-        return getContent(element=xml_element, path=path)
-
-    def _extractPublicationType(self: object, xml_element: TypeVar("Element")) -> str:
-        path = ".//PublicationType"
-        return getContent(element=xml_element, path=path)
-
-    def _extractPublicationDate(self: object, xml_element: TypeVar("Element")) -> str:
-        path = ".//PubDate/Year"
-        return getContent(element=xml_element, path=path)
-
-    def _extractPublisher(self: object, xml_element: TypeVar("Element")) -> str:
-        path = ".//Publisher/PublisherName"
-        return getContent(element=xml_element, path=path)
-
-    def _extractPublisherLocation(self: object, xml_element: TypeVar("Element")) -> str:
-        path = ".//Publisher/PublisherLocation"
-        return getContent(element=xml_element, path=path)
-
-    def _extractAuthors(self: object, xml_element: TypeVar("Element")) -> list:
-        return [
-            {
-                "collective": getContent(author, path=".//CollectiveName"),
-                "lastname": getContent(element=author, path=".//LastName"),
-                "firstname": getContent(element=author, path=".//ForeName"),
-                "initials": getContent(element=author, path=".//Initials"),
-            }
-            for author in xml_element.findall(".//Author")
-        ]
-
-    def _extractSections(self: object, xml_element: TypeVar("Element")) -> list:
-        return [
-            {
-                "title": getContent(section, path=".//SectionTitle"),
-                "chapter": getContent(element=section, path=".//LocationLabel"),
-            }
-            for section in xml_element.findall(".//Section")
-        ]
+    def _initializeFromXML(
+        self: object, xml_element: TypeVar("Element"), fields: Optional[frozenset] = None
+    ) -> None:
+        """ Helper method that parses an XML element into an article object,
+            walking the element tree once and dispatching on the tag. Fields
+            outside of the projection are None.
+        """
 
-    def _initializeFromXML(self: object, xml_element: TypeVar("Element")) -> None:
-        """ Helper method that parses an XML element into an article object.
-        """
-
-        # Parse the different fields of the article
-        self.pubmed_id = self._extractPubMedId(xml_element)
-        self.title = self._extractTitle(xml_element)
-        self.abstract = self._extractAbstract(xml_element)
-        self.copyrights = self._extractCopyrights(xml_element)
-        self.doi = self._extractDoi(xml_element)
-        self.isbn = self._extractIsbn(xml_element)
-        self.language = self._extractLanguage(xml_element)
-        self.publication_date = self._extractPublicationDate(xml_element)
-        self.authors = self._extractAuthors(xml_element)
-        self.publication_type = self._extractPublicationType(xml_element)
-        self.publisher = self._extractPublisher(xml_element)
-        self.publisher_location = self._extractPublisherLocation(xml_element)
-        self.sections = self._extractSections(xml_element)
+        # Text of every matching element per field (None: no element found)
+        pubmed_ids, dois, titles, abstracts, copyrights = None, None, None, None, None
+        isbns, languages, publication_types, publication_dates = None, None, None, None
+        publishers, publisher_locations = None, None
+        authors = []
+        sections = []
+
+        tags = projectionTags(BOOK_TAGS, BOOK_FIELD_TAGS, fields)
+        for element in xml_element.iter():
+            tag = element.tag
+            if tag not in tags:
+                continue
+
+            if tag == "Author":
+                authors.append(extractChildren(element, BOOK_AUTHOR_FIELDS))
+            elif tag == "ArticleId":
+                id_type = element.get("IdType")
+                if id_type == "pubmed":
+                    pubmed_ids = appendText(pubmed_ids, element.text)
+                elif id_type == "doi":
+                    dois = appendText(dois, element.text)
+            elif tag == "AbstractText":
+                abstracts = appendText(abstracts, element.text)
+            elif tag == "Section":
+                sections.append(extractChildren(element, BOOK_SECTION_FIELDS))
+            elif tag == "BookTitle":
+                titles = appendText(titles, element.text)
+            elif tag == "PubDate":
+                for child in element:
+                    if child.tag == "Year":
+                        publication_dates = appendText(publication_dates, child.text)
+            elif tag == "Publisher":
+                for child in element:
+                    if child.tag == "PublisherName":
+                        publishers = appendText(publishers, child.text)
+                    elif child.tag == "PublisherLocation":
+                        publisher_locations = appendText(
+                            publisher_locations, child.text
+                        )
+            elif tag == "CopyrightInformation":
+                copyrights = appendText(copyrights, element.text)
+            elif tag == "Isbn":
+                isbns = appendText(isbns, element.text)
+            elif tag == "Language":
+                languages = appendText(languages, element.text)
+            elif tag == "PublicationType":
+                publication_types = appendText(publication_types, element.text)
+
+        # Fill the different fields of the article
+        self.pubmed_id = joinText(pubmed_ids)
+        self.title = joinText(titles)
+        self.abstract = joinText(abstracts)
+        self.copyrights = joinText(copyrights)
+        self.doi = joinText(dois)
+        self.isbn = joinText(isbns)
+        self.language = joinText(languages)
+        self.publication_date = joinText(publication_dates)
+        self.authors = authors
+        self.publication_type = joinText(publication_types)
+        self.publisher = joinText(publishers)
+        self.publisher_location = joinText(publisher_locations)
+        self.sections = sections
+
+        if fields is not None:
+            for field in self.__slots__:
+                if field not in fields:
+                    setattr(self, field, None)
 
     def toDict(self: object) -> dict:
         """ Helper method to convert the parsed information to a Python dict.
         """
 
         return {
-            key: (self.__getattribute__(key) if hasattr(self, key) else None)
+            key: getattr(self, key, None)
             for key in self.__slots__
         }
 
@@ -539,23 +2348,542 @@ class PubMedBookArticle(object):
 # helpers.py
 # -------------------------------------------------------------
 
-def batches(iterable: list, n: int = 1) -> list:
+class PmidSet(object):
+    """ Compact set of PMIDs, one bit per possible PMID. PMIDs are dense
+        integers, so the PMIDs of the whole baseline fit into a few MB where
+        a Python set would take GBs.
+    """
+
+    def __init__(self: object) -> None:
+        self._bits = bytearray()
+
+    def __contains__(self: object, pmid: int) -> bool:
+        index = pmid >> 3
+        return index < len(self._bits) and bool(self._bits[index] & (1 << (pmid & 7)))
+
+    def add(self: object, pmid: int) -> None:
+        index = pmid >> 3
+        if index >= len(self._bits):
+            self._bits.extend(bytes(max(index + 1 - len(self._bits), len(self._bits))))
+        self._bits[index] |= 1 << (pmid & 7)
+
+
+def iterPmids(source: Union[str, Iterable]) -> Iterator:
+    """ Helper method that reads PMIDs from a file or an iterable, validates them
+        and leaves out duplicates (remembered in a PmidSet, so the memory doesn't
+        grow with the number of IDs).
+        Parameters:
+            - source        Str, path of a text file with PMIDs separated by
+                            commas, whitespace or new lines, or an Iterable of
+                            PMIDs (or such lines).
+        Returns:
+            - pmids         Iterator, PMIDs as strings.
+    """
+
+    def lines() -> Iterator:
+        if isinstance(source, str):
+            with open(source, encoding="utf8") as id_file:
+                yield from id_file
+        else:
+            for line in source:
+                yield str(line)
+
+    seen = PmidSet()
+    for line in lines():
+        for token in PMID_SEPARATORS.split(line):
+            if not token:
+                continue
+            if not (token.isascii() and token.isdigit()) or not 0 < int(token) < PMID_MAX:
+                raise ValueError(f"Invalid PMID {token!r}")
+            pmid = int(token)
+            if pmid in seen:
+                continue
+            seen.add(pmid)
+            yield str(pmid)
+
+
+def batches(iterable: Iterable, n: Union[int, AdaptiveBatcher] = 1) -> list:
     """ Helper method that creates batches from an iterable.
         Parameters:
-            - iterable      Iterable, the iterable to batch.
-            - n             Int, the batch size.
+            - iterable      Iterable, the iterable to batch (a sequence is
+                            sliced, an iterator is consumed batch by batch).
+            - n             Int, the batch size (an AdaptiveBatcher is asked for
+                            the size of every batch).
         Returns:
             - batches       List, yields batches of n objects taken from the iterable.
     """
 
+    # Iterators are collected into lists as they produce the items
+    if not hasattr(iterable, "__len__"):
+        iterator = iter(iterable)
+        while True:
+            batch = list(itertools.islice(iterator, batchSize(n)))
+            if not batch:
+                return
+            yield batch
+
     # Get the length of the iterable
     length = len(iterable)
 
     # Start a loop over the iterable
-    for index in range(0, length, n):
+    index = 0
+    while index < length:
 
         # Create a new iterable by slicing the original
-        yield iterable[index : min(index + n, length)]
+        size = batchSize(n)
+        yield iterable[index : min(index + size, length)]
+        index += size
+
+
+def backoffDelay(attempt: int) -> float:
+    """ Helper method that computes the delay before a retry, exponential backoff
+        with full jitter.
+        Parameters:
+            - attempt       Int, number of the failed attempt (starting at 0).
+        Returns:
+            - delay         Float, seconds to wait.
+    """
+
+    return random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF * 2 ** attempt))
+
+
+def retryAfter(response: requests.Response) -> Optional[float]:
+    """ Helper method that reads the Retry-After header of a response.
+        Parameters:
+            - response      Response, the rejected response.
+        Returns:
+            - delay         Float, seconds to wait (None if the header is missing
+                            or invalid).
+    """
+
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+
+    # The header either holds the seconds or an HTTP date
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+        return max(0.0, date.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def historyBatches(
+    webenv: str,
+    query_key: str,
+    ranges: Iterable,
+    n: Union[int, AdaptiveBatcher] = HISTORY_BATCH_SIZE,
+) -> Iterator:
+    """ Helper method that splits a history server result into efetch pages.
+        Parameters:
+            - webenv        Str, WebEnv of the history server session.
+            - query_key     Str, query key of the result.
+            - ranges        Iterable, (start, end) tuples of the positions to
+                            page through.
+            - n             Int, the page size (an AdaptiveBatcher is asked for
+                            the size of every page).
+        Returns:
+            - batches       Iterator, (WebEnv, query_key, retstart, retmax) tuples.
+    """
+
+    for start, end in ranges:
+        retstart = start
+        while retstart < end:
+            retmax = min(batchSize(n), end - retstart)
+            yield webenv, query_key, retstart, retmax
+            retstart += retmax
+
+
+def imapBounded(
+    function: Callable,
+    iterable: Iterable,
+    executor: Executor,
+    inflight: int,
+    ordered: bool = True,
+) -> Iterator:
+    """ Helper method that maps a function over an iterable on an executor,
+        keeping at most a fixed number of tasks pending.
+        Parameters:
+            - function      Callable, function applied to every item.
+            - iterable      Iterable, the items, consumed lazily.
+            - executor      Executor, thread or process pool running the tasks.
+            - inflight      Int, maximum number of pending tasks.
+            - ordered       Bool, yield the results in the order of the items,
+                            otherwise as the tasks complete.
+        Returns:
+            - results       Iterator, the results of the function.
+    """
+
+    iterator = iter(iterable)
+    pending = collections.deque(
+        executor.submit(function, item) for item in itertools.islice(iterator, inflight)
+    )
+
+    try:
+        while pending:
+
+            # Take the next finished task
+            if ordered:
+                future = pending.popleft()
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                future = done.pop()
+                pending.remove(future)
+
+            # Refill the pool before handing out the result
+            for item in itertools.islice(iterator, 1):
+                pending.append(executor.submit(function, item))
+
+            yield future.result()
+
+    # Don't start the remaining tasks if the consumer stops early or a task failed
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def prefetch(iterable: Iterable, maxsize: int = 1) -> Iterator:
+    """ Helper method that consumes an iterable on a background thread, so the
+        next items are produced while the current one is processed.
+        Parameters:
+            - iterable      Iterable, the items (produced on the thread).
+            - maxsize       Int, number of items buffered ahead, the thread
+                            waits while the queue is full.
+        Returns:
+            - items         Iterator, the items in order, an exception of the
+                            iterable is raised here.
+    """
+
+    items = queue.Queue(maxsize=maxsize)
+    stopped = threading.Event()
+    done = object()
+
+    def produce() -> None:
+        try:
+            for item in iterable:
+                if not put((True, item)):
+                    return
+            put((True, done))
+        except BaseException as error:
+            put((False, error))
+
+    def put(entry: tuple) -> bool:
+        # Give up when the consumer is gone instead of blocking forever
+        while not stopped.is_set():
+            try:
+                items.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            success, item = items.get()
+            if not success:
+                raise item
+            if item is done:
+                return
+            yield item
+
+    # Stop the producer if the consumer stops early
+    finally:
+        stopped.set()
+
+
+def iterArticles(
+    chunks: Iterable, fields: Optional[Iterable[str]] = None, lazy: bool = False
+) -> Iterator:
+    """ Helper method that parses PubMed XML incrementally and yields every
+        article as soon as its closing tag is seen.
+        Parameters:
+            - chunks        Iterable, bytes of the XML document.
+            - fields        Iterable, the fields to extract (None: all).
+            - lazy          Bool, extract the fields on first access.
+        Returns:
+            - articles      Iterator, article objects in document order.
+    """
+
+    for element in iterArticleElements(chunks):
+        yield articleFromElement(element, fields=fields, lazy=lazy)
+
+
+def iterArticleElements(chunks: Iterable, tags: Iterable = ARTICLE_ELEMENTS) -> Iterator:
+    """ Helper method that parses PubMed XML incrementally and yields the element
+        of every article as soon as its closing tag is seen. Yielded elements are
+        detached from the document, so only the article being parsed is kept.
+        Parameters:
+            - chunks        Iterable, bytes of the XML document.
+            - tags          Iterable, top level elements to yield (e.g. also
+                            DeleteCitation for update files).
+        Returns:
+            - elements      Iterator, PubmedArticle / PubmedBookArticle elements
+                            in document order.
+    """
+
+    parser = xml.XMLPullParser(events=("start", "end"))
+    root = None
+
+    for chunk in chunks:
+        parser.feed(chunk)
+
+        for event, element in parser.read_events():
+
+            # Remember the document root to be able to drop finished articles
+            if event == "start":
+                if root is None:
+                    root = element
+                continue
+
+            if element.tag not in tags:
+                continue
+
+            yield element
+
+            # Drop the finished article(s) from the document tree
+            root.clear()
+
+    parser.close()
+
+
+def articleFromElement(
+    element: TypeVar("Element"),
+    fields: Optional[Iterable[str]] = None,
+    lazy: bool = False,
+) -> object:
+    """ Helper method that constructs the article object matching an element.
+        Parameters:
+            - element       Element, PubmedArticle or PubmedBookArticle element.
+            - fields        Iterable, the fields to extract (None: all).
+            - lazy          Bool, extract the fields on first access.
+        Returns:
+            - article       PubMedArticle / PubMedBookArticle.
+    """
+
+    if element.tag == "PubmedBookArticle":
+        return PubMedBookArticle(xml_element=element, fields=fields, lazy=lazy)
+    return PubMedArticle(xml_element=element, fields=fields, lazy=lazy)
+
+
+def articleFromSummary(record: dict) -> object:
+    """ Helper method that constructs the article object of an esummary record,
+        the fields that esummary doesn't return (abstract, keywords, ...) are None.
+        Authors only have a "lastname" and "initials" (esummary names are
+        "Lastname Initials"). Collective authors (authtype "CollectiveName")
+        are not split into names, only books keep their name (like efetch).
+        Parameters:
+            - record        Dict, esummary record of one article.
+        Returns:
+            - article       PubMedArticle / PubMedBookArticle.
+    """
+
+    pmid = record.get("uid")
+    ids = {
+        article_id.get("idtype"): article_id.get("value")
+        for article_id in record.get("articleids", [])
+    }
+
+    names = []
+    for author in record.get("authors", []):
+        if author.get("authtype") == "CollectiveName":
+            names.append((author.get("name") or None, None, None))
+            continue
+        lastname, _, initials = author.get("name", "").rpartition(" ")
+        if not lastname:
+            lastname, initials = initials, None
+        names.append((None, lastname, initials))
+
+    # Book chapters and books carry the book title and publisher
+    if record.get("booktitle"):
+        return PubMedBookArticle(
+            pubmed_id=pmid,
+            title=record.get("booktitle"),
+            publication_date=(record.get("pubdate") or "")[:4] or None,
+            authors=[
+                {
+                    "collective": collective,
+                    "lastname": lastname,
+                    "firstname": None,
+                    "initials": initials,
+                }
+                for collective, lastname, initials in names
+            ],
+            doi=ids.get("doi"),
+            language="\n".join(record.get("lang", [])) or None,
+            publication_type="\n".join(record.get("pubtype", [])) or None,
+            publisher=record.get("publishername") or None,
+            publisher_location=record.get("publisherlocation") or None,
+            sections=[],
+        )
+
+    return PubMedArticle(
+        pubmed_id=pmid,
+        title=record.get("title") or None,
+        journal=record.get("fulljournalname") or None,
+        publication_date=summaryDate(record),
+        authors=[
+            {
+                "lastname": lastname,
+                "firstname": None,
+                "initials": initials,
+                "affiliation": None,
+            }
+            for _, lastname, initials in names
+        ],
+        keywords=[],
+        doi=ids.get("doi"),
+    )
+
+
+def summaryDate(record: dict) -> Optional[datetime.date]:
+    """ Helper method that reads the date an article was added to PubMed from an
+        esummary record, the same date efetch reports as PubMedPubDate "pubmed".
+        Parameters:
+            - record        Dict, esummary record of one article.
+        Returns:
+            - date          Date, None if it is missing.
+    """
+
+    dates = [
+        entry.get("date")
+        for entry in record.get("history", [])
+        if entry.get("pubstatus") == "pubmed"
+    ]
+    dates.append(record.get("sortpubdate"))
+
+    for date in dates:
+        try:
+            return datetime.datetime.strptime(date[:10], "%Y/%m/%d").date()
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def articleFromSource(
+    source: bytes,
+    pmid: Optional[str] = None,
+    fields: Optional[Iterable[str]] = None,
+    lazy: bool = False,
+) -> object:
+    """ Helper method that constructs the article object of a serialized element,
+        a lazy article keeps the bytes without parsing them.
+        Parameters:
+            - source        Bytes, serialized PubmedArticle or PubmedBookArticle.
+            - pmid          Str, PMID of the article.
+            - fields        Iterable, the fields to extract (None: all).
+            - lazy          Bool, extract the fields on first access.
+        Returns:
+            - article       PubMedArticle / PubMedBookArticle.
+    """
+
+    if source.lstrip().startswith(b"<PubmedBookArticle"):
+        return PubMedBookArticle(source=source, fields=fields, lazy=lazy, pmid=pmid)
+    return PubMedArticle(source=source, fields=fields, lazy=lazy, pmid=pmid)
+
+
+def projectionTags(
+    tags: frozenset, field_tags: dict, fields: Optional[frozenset]
+) -> frozenset:
+    """ Helper method that selects the tags the single pass has to handle.
+        Parameters:
+            - tags          Frozenset, the tags of all fields.
+            - field_tags    Dict, tags per field.
+            - fields        Frozenset, the projected fields (None: all).
+        Returns:
+            - tags          Frozenset, the tags of the projected fields.
+    """
+
+    if fields is None:
+        return tags
+    return frozenset(
+        tag for field in fields for tag in field_tags.get(field, ())
+    )
+
+
+def elementPmid(element: TypeVar("Element")) -> Optional[str]:
+    """ Helper method that reads the PMID of an article element (the pubmed_id
+        field also contains the PMIDs of the references).
+        Parameters:
+            - element       Element, PubmedArticle or PubmedBookArticle element.
+        Returns:
+            - pmid          Str, PMID of the article.
+    """
+
+    if element.tag == "PubmedBookArticle":
+        return element.findtext("BookDocument/PMID")
+    return element.findtext("MedlineCitation/PMID")
+
+
+def appendText(texts: Optional[list], text: Optional[str]) -> list:
+    """ Helper method that collects the text of a matching element for joinText.
+        Parameters:
+            - texts     List, texts collected so far (None if nothing matched yet).
+            - text      Str, text of the matching element.
+        Returns:
+            - texts     List, texts including the new one.
+    """
+
+    if texts is None:
+        texts = []
+    if text is not None:
+        texts.append(text)
+    return texts
+
+
+def joinText(
+    texts: Optional[list], default: str = None, separator: str = "\n"
+) -> str:
+    """ Helper method that joins collected texts the same way as getContent.
+        Parameters:
+            - texts     List, collected texts (None if no element matched).
+            - default   Str, default value to return when no element matched.
+        Returns:
+            - text      Str, joined text.
+    """
+
+    if texts is None:
+        return default
+    return separator.join(texts)
+
+
+def extractChildren(
+    element: TypeVar("Element"), fields: dict, container: str = None
+) -> dict:
+    """ Helper method that reads the text of several descendant tags of an
+        element in one pass, like getContent with a ".//Tag" path per field.
+        Parameters:
+            - element   Element, the XML element to parse (e.g. an Author).
+            - fields    Dict, output key per tag.
+            - container Str, tag that has to be the parent of the last field
+                        in fields (e.g. "AffiliationInfo" for "Affiliation").
+        Returns:
+            - values    Dict, text per output key (None when not found).
+    """
+
+    texts = dict.fromkeys(fields.values())
+    nested = None
+    if container is not None:
+        nested = list(fields)[-1]
+
+    for child in element.iter():
+        tag = child.tag
+        if tag == container:
+            for grandchild in child:
+                if grandchild.tag == nested:
+                    key = fields[nested]
+                    texts[key] = appendText(texts[key], grandchild.text)
+        elif tag in fields and tag != nested:
+            key = fields[tag]
+            texts[key] = appendText(texts[key], child.text)
+
+    return {key: joinText(value) for key, value in texts.items()}
 
 
 def getContent(
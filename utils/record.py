@@ -0,0 +1,68 @@
+import datetime
+import json
+from typing import Optional
+
+
+class ArticleRecord(object):
+    """ The fields of an article read by the processing of the App, taken from
+        a PubMedArticle / PubMedBookArticle once. Fields the article doesn't
+        have (e.g. the journal of a book) are None.
+    """
+
+    __slots__ = (
+        "pubmed_id",
+        "title",
+        "journal",
+        "authors",
+        "abstract",
+        "results",
+        "keywords",
+        "conclusions",
+        "publication_date",
+    )
+
+    def __init__(self: object, **kwargs) -> None:
+        for field in self.__slots__:
+            setattr(self, field, kwargs.get(field))
+
+    @classmethod
+    def fromArticle(cls: type, article: object) -> "ArticleRecord":
+        """ Build the record of an article object.
+            Parameters:
+                - article       PubMedArticle / PubMedBookArticle (or a row of an
+                                ArticleTable).
+            Returns:
+                - record        ArticleRecord.
+        """
+
+        return cls(**{field: getattr(article, field, None) for field in cls.__slots__})
+
+    @property
+    def publication_year(self: object) -> Optional[str]:
+        """ Year of the publication date (books only have a year).
+        """
+
+        if self.publication_date is None:
+            return None
+        if isinstance(self.publication_date, datetime.date):
+            return str(self.publication_date.year)
+        return str(self.publication_date).split("-")[0]
+
+    def toDict(self: object) -> dict:
+        """ Helper method to convert the record to a Python dict.
+        """
+
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def toJSON(self: object) -> str:
+        """ Helper method to export the record as JSON string.
+        """
+
+        return json.dumps(
+            {
+                key: (value if not isinstance(value, datetime.date) else str(value))
+                for key, value in self.toDict().items()
+            },
+            sort_keys=True,
+            indent=4,
+        )
@@ -0,0 +1,420 @@
+from array import array
+import datetime
+import json
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+
+from .pmq import (
+    ARTICLE_AUTHOR_FIELDS,
+    BOOK_AUTHOR_FIELDS,
+    BOOK_SECTION_FIELDS,
+    PubMedArticle,
+    PubMedBookArticle,
+)
+
+
+# Row kinds, the slots of the matching article class
+KIND_ARTICLE = 0
+KIND_BOOK = 1
+KIND_FIELDS = (PubMedArticle.__slots__, PubMedBookArticle.__slots__)
+
+# Keys of the author dicts per kind
+KIND_AUTHOR_KEYS = (
+    tuple(ARTICLE_AUTHOR_FIELDS.values()),
+    tuple(BOOK_AUTHOR_FIELDS.values()),
+)
+AUTHOR_KEYS = ("collective", "lastname", "firstname", "initials", "affiliation")
+
+# Free text fields, stored in one buffer per field
+TEXT_FIELDS = (
+    "title",
+    "abstract",
+    "methods",
+    "conclusions",
+    "results",
+    "copyrights",
+    "doi",
+    "isbn",
+    "publication_type",
+    "publisher_location",
+)
+
+# Fields with few distinct values, stored as codes into a list of values
+DICTIONARY_FIELDS = ("journal", "language", "publisher")
+
+
+class ArticleTable(object):
+    """ Columnar store of articles. PMIDs, years and dates are NumPy arrays,
+        journals, languages and publishers are dictionary encoded, text fields
+        share one UTF-8 buffer per field and authors, keywords and sections
+        are flat columns indexed by offsets. Rows are returned as ArticleRow
+        views that behave like PubMedArticle / PubMedBookArticle objects (the
+        pubmed_id is the PMID of the article only, without the PMIDs of the
+        references, and the XML element is not kept).
+    """
+
+    def __init__(self: object, columns: dict) -> None:
+        """ Initialization of the table from finished columns, use fromArticles
+            to build a table.
+        """
+
+        self.pmid = columns["pmid"]
+        self.kind = columns["kind"]
+        self.year = columns["year"]
+        self.publication_date = columns["publication_date"]
+        self.text = {field: columns[field] for field in TEXT_FIELDS}
+        self.dictionary = {field: columns[field] for field in DICTIONARY_FIELDS}
+        self.authors = columns["authors"]
+        self.keywords = columns["keywords"]
+        self.sections = columns["sections"]
+
+    @classmethod
+    def fromArticles(cls: type, articles: Iterable) -> "ArticleTable":
+        """ Build a table from article objects, consuming them one by one.
+            Parameters:
+                - articles      Iterable, PubMedArticle / PubMedBookArticle objects.
+            Returns:
+                - table         ArticleTable.
+        """
+
+        pmids = array("q")
+        kinds = array("b")
+        years = array("h")
+        dates = array("q")
+        text = {field: StringColumnBuilder() for field in TEXT_FIELDS}
+        dictionary = {field: DictionaryColumnBuilder() for field in DICTIONARY_FIELDS}
+        authors = ListColumnBuilder(AUTHOR_KEYS)
+        keywords = ListColumnBuilder()
+        sections = ListColumnBuilder(tuple(BOOK_SECTION_FIELDS.values()))
+
+        for article in articles:
+            book = isinstance(article, PubMedBookArticle)
+            kinds.append(KIND_BOOK if book else KIND_ARTICLE)
+            pmids.append(articlePmid(article))
+
+            # Journal articles have a date, books only a year
+            year, date = 0, NAT
+            if book:
+                if article.publication_date and article.publication_date.isdigit():
+                    year = int(article.publication_date)
+            elif article.publication_date is not None:
+                year = article.publication_date.year
+                date = (article.publication_date - EPOCH).days
+            years.append(year)
+            dates.append(date)
+
+            for field in TEXT_FIELDS:
+                text[field].append(getattr(article, field, None))
+            for field in DICTIONARY_FIELDS:
+                dictionary[field].append(getattr(article, field, None))
+
+            authors.append(article.authors or [])
+            keywords.append(getattr(article, "keywords", None) or [])
+            sections.append(getattr(article, "sections", None) or [])
+
+        columns = {
+            "pmid": np.frombuffer(pmids, dtype=np.int64),
+            "kind": np.frombuffer(kinds, dtype=np.int8),
+            "year": np.frombuffer(years, dtype=np.int16),
+            "publication_date": np.frombuffer(dates, dtype=np.int64).view(
+                "datetime64[D]"
+            ),
+            "authors": authors.finish(),
+            "keywords": keywords.finish(),
+            "sections": sections.finish(),
+        }
+        columns.update((field, builder.finish()) for field, builder in text.items())
+        columns.update(
+            (field, builder.finish()) for field, builder in dictionary.items()
+        )
+        return cls(columns)
+
+    def __len__(self: object) -> int:
+        return len(self.pmid)
+
+    def __getitem__(self: object, index: int) -> "ArticleRow":
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ArticleTable index out of range")
+        return ArticleRow(self, index)
+
+    def __iter__(self: object) -> Iterator:
+        for index in range(len(self)):
+            yield ArticleRow(self, index)
+
+    @property
+    def nbytes(self: object) -> int:
+        """ Approximate memory used by the columns in bytes.
+        """
+
+        columns = [
+            self.pmid,
+            self.kind,
+            self.year,
+            self.publication_date,
+            self.authors,
+            self.keywords,
+            self.sections,
+            *self.text.values(),
+            *self.dictionary.values(),
+        ]
+        return sum(column.nbytes for column in columns)
+
+    def value(self: object, field: str, index: int) -> object:
+        """ Helper method that returns a field of a row the way the article
+            objects hold it.
+            Parameters:
+                - field         Str, name of the article attribute.
+                - index         Int, row number.
+            Returns:
+                - value         Object, the value of the field.
+        """
+
+        kind = self.kind[index]
+        if field not in KIND_FIELDS[kind]:
+            raise AttributeError(field)
+
+        if field in self.text:
+            return self.text[field][index]
+        if field in self.dictionary:
+            return self.dictionary[field][index]
+        if field == "pubmed_id":
+            return str(self.pmid[index]) if self.pmid[index] else None
+        if field == "publication_date":
+            if kind == KIND_BOOK:
+                return str(self.year[index]) if self.year[index] else None
+            date = self.publication_date[index]
+            return None if np.isnat(date) else date.astype(datetime.date)
+        if field == "authors":
+            keys = KIND_AUTHOR_KEYS[kind]
+            return [
+                {key: author[key] for key in keys} for author in self.authors[index]
+            ]
+        if field == "keywords":
+            return self.keywords[index]
+        if field == "sections":
+            return self.sections[index]
+
+        # Fields that are not stored (the XML element)
+        return None
+
+
+class ArticleRow(object):
+    """ View of one row of an ArticleTable with the attributes of a
+        PubMedArticle / PubMedBookArticle, fields are read from the columns
+        on access.
+    """
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self: object, table: ArticleTable, index: int) -> None:
+        self._table = table
+        self._index = index
+
+    def __getattr__(self: object, field: str) -> object:
+        if field.startswith("_"):
+            raise AttributeError(field)
+        return self._table.value(field, self._index)
+
+    @property
+    def _pmid(self: object) -> Optional[str]:
+        """ PMID of the row, like the _pmid of the article objects.
+        """
+
+        return self._table.value("pubmed_id", self._index)
+
+    def isBook(self: object) -> bool:
+        return self._table.kind[self._index] == KIND_BOOK
+
+    def toDict(self: object) -> dict:
+        """ Helper method to convert the row to a Python dict, like the toDict
+            of the article classes.
+        """
+
+        fields = KIND_FIELDS[self._table.kind[self._index]]
+        return {field: self._table.value(field, self._index) for field in fields}
+
+    def toJSON(self: object) -> str:
+        """ Helper method for debugging, dumps the row as JSON string.
+        """
+
+        return json.dumps(
+            {
+                key: (value if not isinstance(value, datetime.date) else str(value))
+                for key, value in self.toDict().items()
+            },
+            sort_keys=True,
+            indent=4,
+        )
+
+
+# -------------------------------------------------------------
+# columns
+# -------------------------------------------------------------
+
+# Day number of a missing date in the datetime64[D] column
+NAT = np.iinfo(np.int64).min
+EPOCH = datetime.date(1970, 1, 1)
+
+
+class StringColumn(object):
+    """ Strings stored in one UTF-8 buffer with offsets, None is kept in a mask.
+    """
+
+    def __init__(self: object, data: bytes, offsets: np.ndarray, missing: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+        self.missing = missing
+
+    def __len__(self: object) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self: object, index: int) -> Optional[str]:
+        if self.missing[index]:
+            return None
+        return self.data[self.offsets[index] : self.offsets[index + 1]].decode("utf8")
+
+    @property
+    def nbytes(self: object) -> int:
+        return len(self.data) + self.offsets.nbytes + self.missing.nbytes
+
+
+class StringColumnBuilder(object):
+    """ Collects the strings of a StringColumn.
+    """
+
+    def __init__(self: object) -> None:
+        self._data = bytearray()
+        self._offsets = array("q", [0])
+        self._missing = bytearray()
+
+    def append(self: object, value: Optional[str]) -> None:
+        if value is not None:
+            self._data += value.encode("utf8")
+        self._offsets.append(len(self._data))
+        self._missing.append(value is None)
+
+    def finish(self: object) -> StringColumn:
+        return StringColumn(
+            bytes(self._data),
+            np.frombuffer(self._offsets, dtype=np.int64),
+            np.frombuffer(bytes(self._missing), dtype=np.bool_),
+        )
+
+
+class DictionaryColumn(object):
+    """ Strings stored as codes into a list of the distinct values, -1 is None.
+    """
+
+    def __init__(self: object, codes: np.ndarray, values: list) -> None:
+        self.codes = codes
+        self.values = values
+
+    def __len__(self: object) -> int:
+        return len(self.codes)
+
+    def __getitem__(self: object, index: int) -> Optional[str]:
+        code = self.codes[index]
+        return None if code < 0 else self.values[code]
+
+    @property
+    def nbytes(self: object) -> int:
+        return self.codes.nbytes + sum(len(value) for value in self.values)
+
+    def counts(self: object) -> dict:
+        """ Number of rows per value, counted with NumPy.
+        """
+
+        counts = np.bincount(self.codes[self.codes >= 0], minlength=len(self.values))
+        return dict(zip(self.values, counts.tolist()))
+
+
+class DictionaryColumnBuilder(object):
+    """ Collects the codes and distinct values of a DictionaryColumn.
+    """
+
+    def __init__(self: object) -> None:
+        self._codes = array("i")
+        self._index = {}
+
+    def append(self: object, value: Optional[str]) -> None:
+        if value is None:
+            self._codes.append(-1)
+            return
+        code = self._index.get(value)
+        if code is None:
+            code = self._index[value] = len(self._index)
+        self._codes.append(code)
+
+    def finish(self: object) -> DictionaryColumn:
+        return DictionaryColumn(
+            np.frombuffer(self._codes, dtype=np.int32), list(self._index)
+        )
+
+
+class ListColumn(object):
+    """ Lists per row stored flat, offsets index the items of every row. The
+        items are strings, or dicts with one StringColumn per key.
+    """
+
+    def __init__(self: object, offsets: np.ndarray, items: dict) -> None:
+        self.offsets = offsets
+        self.items = items
+
+    def __len__(self: object) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self: object, index: int) -> list:
+        positions = range(self.offsets[index], self.offsets[index + 1])
+        if None in self.items:
+            return [self.items[None][position] for position in positions]
+        return [
+            {key: column[position] for key, column in self.items.items()}
+            for position in positions
+        ]
+
+    @property
+    def nbytes(self: object) -> int:
+        return self.offsets.nbytes + sum(column.nbytes for column in self.items.values())
+
+
+class ListColumnBuilder(object):
+    """ Collects the items of a ListColumn.
+    """
+
+    def __init__(self: object, keys: Optional[tuple] = None) -> None:
+        self._keys = keys
+        self._offsets = array("q", [0])
+        self._items = {key: StringColumnBuilder() for key in (keys or (None,))}
+
+    def append(self: object, values: list) -> None:
+        for value in values:
+            if self._keys is None:
+                self._items[None].append(value)
+            else:
+                for key in self._keys:
+                    self._items[key].append(value.get(key))
+        self._offsets.append(self._offsets[-1] + len(values))
+
+    def finish(self: object) -> ListColumn:
+        return ListColumn(
+            np.frombuffer(self._offsets, dtype=np.int64),
+            {key: builder.finish() for key, builder in self._items.items()},
+        )
+
+
+def articlePmid(article: object) -> int:
+    """ Helper method that returns the PMID of an article object as an integer,
+        the PMID the article objects read from their XML (_pmid).
+        Parameters:
+            - article       PubMedArticle / PubMedBookArticle / ArticleRow.
+        Returns:
+            - pmid          Int, PMID of the article (0 if it has none).
+    """
+
+    if not article._pmid:
+        return 0
+    return int(article._pmid)
+
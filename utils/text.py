@@ -0,0 +1,201 @@
+import json
+import os
+import re
+import threading
+from typing import Callable, Iterable, Optional
+
+
+# Isolated numbers and single letters, removed before the other characters
+# (the spaces around them are kept, so the words are never joined)
+ISOLATED_NUMBERS = re.compile(r"\b(\d+|[a-z])\b")
+
+# Everything but letters, digits and the separators inside numbers (3.5, 1,000)
+NON_WORD_CHARACTERS = re.compile("[^a-zA-Z0-9 .,]|(?<!\\d)[.,]|[.,](?!\\d)")
+
+# Separators that are not between two ASCII digits (left over when a non-ASCII
+# digit next to them was removed), word_tokenize has rules for them
+LOOSE_SEPARATORS = re.compile(r"(?<![0-9])[.,]|[.,](?![0-9])")
+
+# Words word_tokenize splits (its contractions without an apostrophe, the
+# cleaned text has none)
+CONTRACTIONS = {
+    "cannot": ("can", "not"),
+    "gimme": ("gim", "me"),
+    "gonna": ("gon", "na"),
+    "gotta": ("got", "ta"),
+    "lemme": ("lem", "me"),
+    "wanna": ("wan", "na"),
+}
+
+
+class TextNormalizer(object):
+    """ Cleans, filters and tokenizes text like the chain of _clean_text,
+        _remove_stopwords and word_tokenize of the App, with precompiled
+        expressions, a set of stopwords and one pass over the words.
+
+        The cleaned words only consist of [a-z0-9.,] with "." and "," between
+        digits, so word_tokenize splits them at the spaces (its punctuation
+        rules never apply) and only splits the contractions above. The rare
+        words with other separators are still tokenized by word_tokenize.
+    """
+
+    def __init__(self: object, stopwords: Iterable[str]) -> None:
+        """ Initialization of the normalizer.
+            Parameters:
+                - stopwords     Iterable, words that are left out (compared in
+                                lower case).
+        """
+
+        self.stopwords = frozenset(word.lower() for word in stopwords)
+
+    def words(self: object, text: Optional[str], remove_isolated_numbers: bool = True) -> list:
+        """ The cleaned words of a text without stopwords.
+            Parameters:
+                - text          Str, the text (None is empty).
+                - remove_isolated_numbers
+                                Bool, leave out numbers and single letters.
+            Returns:
+                - words         List, lower case words.
+        """
+
+        if not text:
+            return []
+
+        # Whitespace is normalized first, so the expressions can run over the
+        # whole text at once without joining words
+        text = " ".join(text.split())
+        if remove_isolated_numbers:
+            text = ISOLATED_NUMBERS.sub("", text)
+        text = NON_WORD_CHARACTERS.sub("", text).lower()
+
+        stopwords = self.stopwords
+        return [word for word in text.split() if word not in stopwords]
+
+    def tokens(
+        self: object,
+        text: Optional[str],
+        remove_isolated_numbers: bool = True,
+        lemmatize: Optional[Callable] = None,
+    ) -> list:
+        """ The tokens of a text, cleaned, without stopwords, lemmatized and
+            tokenized.
+            Parameters:
+                - text          Str, the text (None is empty).
+                - remove_isolated_numbers
+                                Bool, leave out numbers and single letters.
+                - lemmatize     Callable, returns the lemma of a word (None:
+                                the words are kept).
+            Returns:
+                - tokens        List, the tokens.
+        """
+
+        words = self.words(text, remove_isolated_numbers)
+        if lemmatize is not None:
+            words = [lemmatize(word) for word in words]
+        return tokenize(words)
+
+
+class LemmaTable(object):
+    """ Memo of the lemmas of words, shared by all articles. The same few
+        thousand words make up most of the text, so the WordNet lookup only
+        runs for a word the first time. The table is bounded (the oldest
+        words are dropped first) and can be persisted to a JSON file, which
+        warms it in the next session.
+    """
+
+    def __init__(
+        self: object,
+        path: Optional[str] = None,
+        max_entries: int = 1000000,
+        lemmatize: Optional[Callable] = None,
+    ) -> None:
+        """ Initialization of the table, loads the persisted lemmas.
+            Parameters:
+                - path          Str, JSON file the lemmas are persisted in (None:
+                                memory only).
+                - max_entries   Int, maximum number of stored words.
+                - lemmatize     Callable, returns the lemma of a word (None: the
+                                WordNet lemmatizer of NLTK).
+        """
+
+        self.path = path
+        self.max_entries = max_entries
+
+        self._lemmatize = lemmatize
+        self._lemmas = {}
+        self._lock = threading.Lock()
+        self._changed = False
+
+        if path is not None and os.path.exists(path):
+            with open(path, encoding="utf8") as json_file:
+                self._lemmas = json.load(json_file)
+
+    def __len__(self: object) -> int:
+        return len(self._lemmas)
+
+    def lemmatize(self: object, word: str) -> str:
+        """ The lemma of a word, looked up in WordNet on a miss.
+        """
+
+        lemma = self._lemmas.get(word)
+        if lemma is not None:
+            return lemma
+
+        if self._lemmatize is None:
+            from nltk.stem import WordNetLemmatizer
+
+            self._lemmatize = WordNetLemmatizer().lemmatize
+        lemma = self._lemmatize(word)
+
+        with self._lock:
+            while len(self._lemmas) >= self.max_entries:
+                del self._lemmas[next(iter(self._lemmas))]
+            self._lemmas[word] = lemma
+            self._changed = True
+        return lemma
+
+    def lemmatizeWords(self: object, words: Iterable[str]) -> list:
+        """ The lemmas of several words.
+        """
+
+        lemmas = self._lemmas
+        return [lemmas.get(word) or self.lemmatize(word) for word in words]
+
+    def save(self: object) -> None:
+        """ Write the table to its JSON file if words were added.
+        """
+
+        if self.path is None or not self._changed:
+            return
+
+        with self._lock:
+            temporary = f"{self.path}.tmp"
+            with open(temporary, "w", encoding="utf8") as json_file:
+                json.dump(self._lemmas, json_file)
+            os.replace(temporary, self.path)
+            self._changed = False
+
+
+def tokenize(words: Iterable[str]) -> list:
+    """ Helper method that tokenizes cleaned words like word_tokenize tokenizes
+        the words joined by spaces.
+        Parameters:
+            - words         Iterable, cleaned (and lemmatized) words.
+        Returns:
+            - tokens        List, the tokens.
+    """
+
+    words = list(words)
+    if any(LOOSE_SEPARATORS.search(word) for word in words if "." in word or "," in word):
+        from nltk.tokenize import word_tokenize
+
+        return word_tokenize(" ".join(words))
+
+    tokens = []
+    for word in words:
+        split = CONTRACTIONS.get(word)
+        if split is None:
+            tokens.append(word)
+        else:
+            tokens += split
+    return tokens